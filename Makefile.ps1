@@ -8,6 +8,10 @@ function Test {
   pytest -q
 }
 
+function Bench {
+  python -m benchmarks --baseline benchmarks/baseline.json
+}
+
 function Format {
   # Optional: install black/isort or use ruff if you prefer
   python -m black .
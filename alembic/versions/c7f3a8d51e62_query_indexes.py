@@ -0,0 +1,84 @@
+"""query indexes
+
+Replace single-column session indexes with ones matching the hot queries and
+drop indexes no query uses. On Postgres the indexes are built and dropped
+CONCURRENTLY (outside the migration transaction) so the tables stay writable.
+
+Revision ID: c7f3a8d51e62
+Revises: b41d7c2e9a10
+Create Date: 2026-10-18 14:03:52.781930
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7f3a8d51e62"
+down_revision = "b41d7c2e9a10"
+branch_labels = None
+depends_on = None
+
+
+def _concurrently() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _create_index(name, table, columns, where=None):
+    op.create_index(
+        name,
+        table,
+        columns,
+        unique=False,
+        postgresql_concurrently=_concurrently(),
+        postgresql_where=sa.text(where) if where else None,
+        sqlite_where=sa.text(where) if where else None,
+    )
+
+
+def _drop_index(name, table):
+    op.drop_index(name, table_name=table, postgresql_concurrently=_concurrently())
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index(
+            "ix_sessiontoken_user_id_created_at",
+            "sessiontoken",
+            ["user_id", "created_at", "id"],
+        )
+        _create_index(
+            "ix_sessiontoken_active_user_id",
+            "sessiontoken",
+            ["user_id"],
+            where="revoked_at IS NULL",
+        )
+        _create_index(
+            "ix_sessiontoken_revoked_at",
+            "sessiontoken",
+            ["revoked_at"],
+            where="revoked_at IS NOT NULL",
+        )
+        # prefix of ix_sessiontoken_user_id_created_at
+        _drop_index("ix_sessiontoken_user_id", "sessiontoken")
+        # never queried; only slowed down session inserts
+        _drop_index("ix_sessiontoken_refresh_token_hash", "sessiontoken")
+        _drop_index("ix_sessiontoken_device_fingerprint", "sessiontoken")
+        # duplicates the primary key
+        _drop_index("ix_user_id", "user")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index("ix_user_id", "user", ["id"])
+        _create_index(
+            "ix_sessiontoken_device_fingerprint", "sessiontoken", ["device_fingerprint"]
+        )
+        _create_index(
+            "ix_sessiontoken_refresh_token_hash", "sessiontoken", ["refresh_token_hash"]
+        )
+        _create_index("ix_sessiontoken_user_id", "sessiontoken", ["user_id"])
+        _drop_index("ix_sessiontoken_revoked_at", "sessiontoken")
+        _drop_index("ix_sessiontoken_active_user_id", "sessiontoken")
+        _drop_index("ix_sessiontoken_user_id_created_at", "sessiontoken")
@@ -0,0 +1,132 @@
+"""partition auditlog
+
+On Postgres, rebuild ``auditlog`` as a table range-partitioned by month on
+``created_at`` (primary key becomes (id, created_at)), with a default
+partition catching anything outside the monthly ranges. Existing rows are
+copied across. Elsewhere only the indexes change.
+
+Revision ID: e58b2f0c9d47
+Revises: c7f3a8d51e62
+Create Date: 2026-10-18 16:41:07.205318
+
+"""
+
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e58b2f0c9d47"
+down_revision = "c7f3a8d51e62"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ("ix_auditlog_user_id_created_at", ["user_id", "created_at"]),
+    ("ix_auditlog_action_created_at", ["action", "created_at"]),
+    ("ix_auditlog_created_at", ["created_at"]),
+]
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    year, month = divmod(dt.month - 1 + months, 12)
+    return datetime(dt.year + year, month + 1, 1)
+
+
+def _partition_postgres() -> None:
+    bind = op.get_bind()
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_unpartitioned")
+    op.execute(
+        "ALTER TABLE auditlog_unpartitioned "
+        "RENAME CONSTRAINT auditlog_pkey TO auditlog_unpartitioned_pkey"
+    )
+    op.execute("""
+        CREATE TABLE auditlog (
+            id INTEGER NOT NULL DEFAULT nextval('auditlog_id_seq'),
+            user_id INTEGER REFERENCES "user" (id),
+            action VARCHAR(50) NOT NULL,
+            ip VARCHAR(64) NOT NULL,
+            user_agent VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """)
+    # keep the sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute("CREATE TABLE auditlog_default PARTITION OF auditlog DEFAULT")
+
+    now = datetime.utcnow()
+    oldest = bind.scalar(sa.text("SELECT min(created_at) FROM auditlog_unpartitioned"))
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE auditlog_p{month:%Y%m} PARTITION OF auditlog "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{nxt:%Y-%m-%d}')"
+        )
+        month = nxt
+
+    op.execute(
+        "INSERT INTO auditlog (id, user_id, action, ip, user_agent, created_at) "
+        "SELECT id, user_id, action, ip, user_agent, created_at "
+        "FROM auditlog_unpartitioned"
+    )
+    op.drop_table("auditlog_unpartitioned")
+    for name, columns in INDEXES:
+        op.create_index(name, "auditlog", columns)
+
+
+def _unpartition_postgres() -> None:
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_partitioned")
+    op.execute(
+        "ALTER TABLE auditlog_partitioned "
+        "RENAME CONSTRAINT auditlog_pkey TO auditlog_partitioned_pkey"
+    )
+    op.create_table(
+        "auditlog",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('auditlog_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(length=50), nullable=False),
+        sa.Column("ip", sa.String(length=64), nullable=False),
+        sa.Column("user_agent", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute(
+        "INSERT INTO auditlog (id, user_id, action, ip, user_agent, created_at) "
+        "SELECT id, user_id, action, ip, user_agent, created_at "
+        "FROM auditlog_partitioned"
+    )
+    op.execute("DROP TABLE auditlog_partitioned CASCADE")
+
+
+def upgrade() -> None:
+    op.drop_index("ix_auditlog_action", table_name="auditlog")
+    op.drop_index("ix_auditlog_user_id", table_name="auditlog")
+    if op.get_context().dialect.name == "postgresql":
+        _partition_postgres()
+    else:
+        for name, columns in INDEXES:
+            op.create_index(name, "auditlog", columns)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "postgresql":
+        _unpartition_postgres()
+    else:
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name="auditlog")
+    op.create_index("ix_auditlog_user_id", "auditlog", ["user_id"], unique=False)
+    op.create_index("ix_auditlog_action", "auditlog", ["action"], unique=False)
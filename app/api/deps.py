@@ -1,34 +1,106 @@
-from typing import Generator, Optional
+from typing import Any, AsyncGenerator, Dict, Optional
 
-from fastapi import Cookie, Header, Request
-from sqlalchemy.orm import Session
+from fastapi import Depends, Header, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import decode_jwt
-from app.db.session import get_db
+from app.core.rate_limit import RateLimitPolicy, is_allowed
+from app.core.security import decode_jwt_cached
+from app.db.session import get_db, get_read_db
+from app.models import Role, User
+from app.services.revocation import revocation_cache
 
 
-def get_db_session() -> Generator[Session, None, None]:
-    yield from get_db()
+async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async for db in get_db():
+        yield db
 
 
-def get_current_user_id_optional(
-    request: Request,
-    access_token: Optional[str] = Cookie(default=None, alias="access_token"),
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Like ``get_db_session``, but SELECTs go to a replica until a write."""
+    async for db in get_read_db():
+        yield db
+
+
+async def get_access_claims(request: Request) -> Optional[Dict[str, Any]]:
+    """Verify the access-token cookie once per request.
+
+    The claims (or None when the cookie is missing or invalid) are stored on
+    ``request.state.access_claims`` so any later consumer reuses them.
+    """
+    if hasattr(request.state, "access_claims"):
+        return request.state.access_claims
+    claims = None
+    access = request.cookies.get("access_token")
+    if access:
+        try:
+            payload = decode_jwt_cached(access)
+            if (
+                payload.get("type") == "access"
+                and str(payload.get("sub")).isdigit()
+                and not revocation_cache.is_revoked(payload.get("sid"))
+            ):
+                claims = payload
+        except Exception:
+            claims = None
+    request.state.access_claims = claims
+    return claims
+
+
+async def get_current_user_id_optional(
+    claims: Optional[Dict[str, Any]] = Depends(get_access_claims),
 ) -> Optional[int]:
-    if not access_token:
-        return None
-    try:
-        payload = decode_jwt(access_token)
-        if payload.get("type") != "access":
-            return None
-        sub = payload.get("sub")
-        return int(sub)
-    except Exception:
-        return None
-
-
-def get_client_meta(
+    return int(claims["sub"]) if claims else None
+
+
+async def get_current_user_id(
+    uid: Optional[int] = Depends(get_current_user_id_optional),
+) -> int:
+    if uid is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return uid
+
+
+async def get_current_admin_id(
+    uid: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+) -> int:
+    role = await db.scalar(
+        select(Role.name).join(User, User.role_id == Role.id).where(User.id == uid)
+    )
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return uid
+
+
+async def get_client_meta(
     ua: Optional[str] = Header(None, alias="User-Agent"), request: Request = None
 ):
     ip = request.client.host if request and request.client else "0.0.0.0"
     return {"ip": ip, "user_agent": ua or ""}
+
+
+class RateLimit:
+    """Dependency enforcing a rate-limit policy, keyed by client IP by default.
+
+    Use ``Depends(RateLimit(policy))`` on a route, or call ``check`` directly
+    with a custom key (e.g. email + IP for login).
+    """
+
+    def __init__(self, policy: RateLimitPolicy) -> None:
+        self.policy = policy
+
+    async def __call__(self, request: Request) -> None:
+        ip = request.client.host if request.client else "0.0.0.0"
+        await self.check(ip)
+
+    async def check(self, key: str) -> None:
+        allowed, retry_after = await is_allowed(
+            f"{self.policy.name}:{key}", self.policy.limit, self.policy.window_seconds
+        )
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many attempts. Try again in {retry_after}s",
+                headers={"Retry-After": str(retry_after)},
+            )
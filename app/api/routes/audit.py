@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin_id, get_read_db_session
+from app.schemas.audit import AuditPage
+from app.services.audit import AuditFilter, export_audit, query_audit
+from app.utils.cursor import decode_cursor, encode_cursor
+
+router = APIRouter(
+    prefix="/admin/audit",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin_id)],
+)
+
+
+def get_audit_filter(
+    user_id: int | None = None,
+    action: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AuditFilter:
+    return AuditFilter(user_id=user_id, action=action, since=since, until=until)
+
+
+@router.get("/", response_model=AuditPage)
+async def list_audit(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    filters: AuditFilter = Depends(get_audit_filter),
+    db: AsyncSession = Depends(get_read_db_session),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, next_after = await query_audit(db, filters, limit=limit, after=after)
+    return AuditPage(
+        items=rows, next_cursor=encode_cursor(next_after) if next_after else None
+    )
+
+
+@router.get("/export")
+async def export(filters: AuditFilter = Depends(get_audit_filter)):
+    return StreamingResponse(
+        export_audit(filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="audit.ndjson"'},
+    )
@@ -2,67 +2,64 @@ from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_client_meta, get_db_session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import (
+    RateLimit,
+    get_client_meta,
+    get_current_user_id,
+    get_db_session,
+    get_read_db_session,
+)
 from app.core.config import settings
-from app.core.rate_limit import is_allowed
-from app.core.security import decode_jwt, get_password_hash
+from app.core.rate_limit import email_policy, login_policy, register_policy
+from app.core.security import decode_jwt, get_password_hash_async
 from app.models import User
 from app.schemas.auth import LoginIn, PasswordResetIn, PasswordResetRequestIn
 from app.schemas.common import MessageOut
 from app.schemas.user import UserCreate, UserOut
 from app.services import auth as auth_svc
 from app.services.audit import log_action
-from app.services.email import get_email_service
+from app.services.email import get_email_service, outbox_worker
+from app.services.sessions import revoke_session
+from app.services.user_cache import user_cache
 from app.utils.cookies import clear_cookie, set_cookie
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+login_rate_limit = RateLimit(login_policy)
+
 
-@router.post("/register", response_model=UserOut)
-def register(
+@router.post(
+    "/register",
+    response_model=UserOut,
+    dependencies=[Depends(RateLimit(register_policy))],
+)
+async def register(
     payload: UserCreate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     meta: dict = Depends(get_client_meta),
     request: Request = None,
 ):
     try:
-        user = auth_svc.register(db, payload.email, payload.password)
+        user, et = await auth_svc.register(db, payload.email, payload.password, meta["ip"], meta["user_agent"])  # type: ignore[index]
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-
-    # send email verification (stub)
-    et = auth_svc.request_email_token(
-        db,
-        user,
-        purpose="verify_email",
-        expires_at=datetime.utcnow()
-        + timedelta(hours=settings.EMAIL_TOKEN_EXPIRE_HOURS),
-    )
-    get_email_service().send_verification(user.email, et.token)
-
-    log_action(db, user_id=user.id, action="register", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
     return user
 
 
 @router.post("/login", response_model=MessageOut)
-def login(
+async def login(
     payload: LoginIn,
     response: Response,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     meta: dict = Depends(get_client_meta),
     request: Request = None,
 ):
-    rl_key = f"login:{payload.email}:{meta['ip']}"
-    allowed, retry_after = is_allowed(rl_key, limit=5, window_seconds=60)
-    if not allowed:
-        raise HTTPException(
-            status_code=429, detail=f"Too many attempts. Try again in {retry_after}s"
-        )
+    await login_rate_limit.check(f"{payload.email}:{meta['ip']}")
 
     try:
-        access, refresh, st = auth_svc.login(db, payload.email, payload.password, meta["ip"], meta["user_agent"])  # type: ignore[index]
+        access, refresh, st = await auth_svc.login(db, payload.email, payload.password, meta["ip"], meta["user_agent"])  # type: ignore[index]
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -78,30 +75,41 @@ def login(
         refresh,
         max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
     )
-
-    log_action(db, user_id=st.user_id, action="login", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
     return {"message": "logged in"}
 
 
 @router.post("/logout", response_model=MessageOut)
-def logout(
+async def logout(
     response: Response,
-    db: Session = Depends(get_db_session),
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
     meta: dict = Depends(get_client_meta),
-    request: Request = None,
 ):
     # best-effort: revoke by refresh sid in cookie
+    uid = None
+    refresh_cookie = request.cookies.get("refresh_token")
+    if refresh_cookie:
+        try:
+            payload = decode_jwt(refresh_cookie)
+            if payload.get("type") == "refresh":
+                uid, sid = int(payload["sub"]), int(payload["sid"])
+        except Exception:
+            uid = None
+    if uid is not None:
+        await revoke_session(db, uid, sid)
+
     clear_cookie(response, "access_token")
     clear_cookie(response, "refresh_token")
-    log_action(db, user_id=None, action="logout", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
+    await log_action(db, user_id=uid, action="logout", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
+    await db.commit()
     return {"message": "logged out"}
 
 
 @router.post("/refresh", response_model=MessageOut)
-def refresh(
+async def refresh(
     response: Response,
     request: Request,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     meta: dict = Depends(get_client_meta),
 ):
     refresh_cookie = request.cookies.get("refresh_token")
@@ -117,7 +125,7 @@ def refresh(
         raise HTTPException(status_code=401, detail="Invalid token")
 
     try:
-        access, new_refresh, st = auth_svc.rotate_refresh(db, uid, sid, meta["ip"], meta["user_agent"])  # type: ignore[index]
+        access, new_refresh = await auth_svc.refresh_tokens(db, uid, sid, meta["ip"], meta["user_agent"])  # type: ignore[index]
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
@@ -133,24 +141,19 @@ def refresh(
         new_refresh,
         max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
     )
-
-    log_action(db, user_id=uid, action="refresh", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
     return {"message": "refreshed"}
 
 
-@router.post("/resend-verification", response_model=MessageOut)
-def resend_verification(request: Request, db: Session = Depends(get_db_session)):
-    # optional: only for logged-in users, but here we accept email via cookie if access presents
-    access = request.cookies.get("access_token")
-    if not access:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    try:
-        payload = decode_jwt(access)
-        uid = int(payload.get("sub"))
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user: User | None = db.get(User, uid)
+@router.post(
+    "/resend-verification",
+    response_model=MessageOut,
+    dependencies=[Depends(RateLimit(email_policy))],
+)
+async def resend_verification(
+    uid: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+):
+    user: User | None = await db.get(User, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -161,36 +164,44 @@ def resend_verification(request: Request, db: Session = Depends(get_db_session))
         expires_at=datetime.utcnow()
         + timedelta(hours=settings.EMAIL_TOKEN_EXPIRE_HOURS),
     )
-    get_email_service().send_verification(user.email, et.token)
+    get_email_service().send_verification(db, user.email, et.token)
+    await db.commit()
+    outbox_worker.notify()
     return {"message": "verification sent"}
 
 
 @router.get("/verify-email", response_model=MessageOut)
-def verify_email(
+async def verify_email(
     token: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     meta: dict = Depends(get_client_meta),
     request: Request = None,
 ):
-    et = auth_svc.consume_email_token(db, token, purpose="verify_email")
+    et = await auth_svc.consume_email_token(db, token, purpose="verify_email")
     if not et:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.get(User, et.user_id)
+    user = await db.get(User, et.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_email_verified = True
     db.add(user)
-    db.commit()
-
-    log_action(db, user_id=user.id, action="verify", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
+    await log_action(db, user_id=user.id, action="verify", ip=meta["ip"], user_agent=meta["user_agent"])  # type: ignore[index]
+    await db.commit()
+    await user_cache.invalidate(user.id)
     return {"message": "email verified"}
 
 
-@router.post("/request-password-reset", response_model=MessageOut)
-def request_password_reset(
-    payload: PasswordResetRequestIn, db: Session = Depends(get_db_session)
+@router.post(
+    "/request-password-reset",
+    response_model=MessageOut,
+    dependencies=[Depends(RateLimit(email_policy))],
+)
+async def request_password_reset(
+    payload: PasswordResetRequestIn,
+    # the lookup reads a replica; staging the token moves the session to the primary
+    db: AsyncSession = Depends(get_read_db_session),
 ):
-    user = db.scalar(select(User).where(User.email == payload.email))
+    user = await db.scalar(select(User).where(User.email == payload.email))
     if user:
         et = auth_svc.request_email_token(
             db,
@@ -199,19 +210,24 @@ def request_password_reset(
             expires_at=datetime.utcnow()
             + timedelta(hours=settings.PASSWORD_RESET_TOKEN_EXPIRE_HOURS),
         )
-        get_email_service().send_password_reset(user.email, et.token)
+        get_email_service().send_password_reset(db, user.email, et.token)
+        await db.commit()
+        outbox_worker.notify()
     return {"message": "if account exists, reset email sent"}
 
 
 @router.post("/reset-password", response_model=MessageOut)
-def reset_password(payload: PasswordResetIn, db: Session = Depends(get_db_session)):
-    et = auth_svc.consume_email_token(db, payload.token, purpose="reset_password")
+async def reset_password(
+    payload: PasswordResetIn, db: AsyncSession = Depends(get_db_session)
+):
+    et = await auth_svc.consume_email_token(db, payload.token, purpose="reset_password")
     if not et:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.get(User, et.user_id)
+    user = await db.get(User, et.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.password_hash = get_password_hash(payload.new_password)
+    user.password_hash = await get_password_hash_async(payload.new_password)
     db.add(user)
-    db.commit()
+    await db.commit()
+    await user_cache.invalidate(user.id)
     return {"message": "password reset"}
@@ -0,0 +1,23 @@
+import hashlib
+
+from fastapi import APIRouter, Request, Response
+
+from app.core.config import settings
+from app.core.keys import keyring
+
+router = APIRouter(tags=["auth"])
+
+_etag = '"' + hashlib.sha256(keyring.jwks).hexdigest()[:32] + '"'
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+        "ETag": _etag,
+    }
+    if request.headers.get("if-none-match") == _etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        keyring.jwks, media_type="application/jwk-set+json", headers=headers
+    )
@@ -1,40 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
 
-from app.api.deps import get_db_session
-from app.core.security import decode_jwt
-from app.schemas.session import SessionOut
-from app.services.sessions import list_sessions, revoke_session
-
-router = APIRouter(prefix="/sessions", tags=["sessions"])
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import (
+    get_access_claims,
+    get_client_meta,
+    get_current_admin_id,
+    get_current_user_id,
+    get_db_session,
+    get_read_db_session,
+)
+from app.schemas.session import RevokedOut, SessionPage, SessionRevokeIn
+from app.services.audit import log_action
+from app.services.sessions import (
+    list_sessions,
+    revoke_device_sessions,
+    revoke_session,
+    revoke_sessions_created,
+    revoke_user_sessions,
+)
+from app.utils.cursor import decode_cursor, encode_cursor
 
-auth_error = HTTPException(status_code=401, detail="Not authenticated")
+router = APIRouter(prefix="/sessions", tags=["sessions"])
+admin_router = APIRouter(
+    prefix="/admin/sessions",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin_id)],
+)
 
 
-def _get_user_id_from_cookie(request: Request) -> int:
-    access = request.cookies.get("access_token")
-    if not access:
-        raise auth_error
+@router.get("/", response_model=SessionPage)
+async def get_sessions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    active_only: bool = False,
+    uid: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db_session),
+):
     try:
-        payload = decode_jwt(access)
-        if payload.get("type") != "access":
-            raise auth_error
-        return int(payload.get("sub"))
-    except Exception:
-        raise auth_error
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, next_after = await list_sessions(
+        db, uid, limit=limit, after=after, active_only=active_only
+    )
+    return SessionPage(
+        items=rows, next_cursor=encode_cursor(next_after) if next_after else None
+    )
 
 
-@router.get("/", response_model=list[SessionOut])
-def get_sessions(request: Request, db: Session = Depends(get_db_session)):
-    uid = _get_user_id_from_cookie(request)
-    return list_sessions(db, uid)
+@router.post("/revoke-all", response_model=RevokedOut)
+async def revoke_all(
+    keep_current: bool = False,
+    uid: int = Depends(get_current_user_id),
+    claims: Optional[Dict[str, Any]] = Depends(get_access_claims),
+    db: AsyncSession = Depends(get_db_session),
+    meta: dict = Depends(get_client_meta),
+):
+    keep = claims.get("sid") if keep_current and claims else None
+    # staged first so it commits together with the revocation
+    await log_action(
+        db,
+        user_id=uid,
+        action="revoke_all_sessions",
+        ip=meta["ip"],
+        user_agent=meta["user_agent"],
+    )
+    revoked = await revoke_user_sessions(db, uid, keep_session_id=keep)
+    return {"revoked": revoked}
 
 
 @router.post("/{session_id}/revoke")
-def revoke(session_id: int, request: Request, db: Session = Depends(get_db_session)):
-    uid = _get_user_id_from_cookie(request)
-    ok = revoke_session(db, uid, session_id)
+async def revoke(
+    session_id: int,
+    uid: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+):
+    ok = await revoke_session(db, uid, session_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Session not found")
     return {"message": "revoked"}
+
+
+@router.post("/{session_id}/revoke-device", response_model=RevokedOut)
+async def revoke_device(
+    session_id: int,
+    uid: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+    meta: dict = Depends(get_client_meta),
+):
+    await log_action(
+        db,
+        user_id=uid,
+        action="revoke_device_sessions",
+        ip=meta["ip"],
+        user_agent=meta["user_agent"],
+    )
+    revoked = await revoke_device_sessions(db, uid, session_id)
+    if revoked is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"revoked": revoked}
+
+
+@admin_router.post("/revoke", response_model=RevokedOut)
+async def admin_revoke(
+    body: SessionRevokeIn,
+    admin_id: int = Depends(get_current_admin_id),
+    db: AsyncSession = Depends(get_db_session),
+    meta: dict = Depends(get_client_meta),
+):
+    await log_action(
+        db,
+        user_id=admin_id,
+        action="admin_revoke_sessions",
+        ip=meta["ip"],
+        user_agent=meta["user_agent"],
+    )
+    revoked = await revoke_sessions_created(
+        db,
+        before=body.created_before,
+        after=body.created_after,
+        user_id=body.user_id,
+    )
+    return {"revoked": revoked}
@@ -1,28 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db_session
-from app.core.security import decode_jwt
-from app.models import User
+from app.api.deps import get_current_user_id, get_db_session
 from app.schemas.user import UserOut
+from app.services.user_cache import user_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserOut)
-def get_me(request: Request, db: Session = Depends(get_db_session)):
-    access = request.cookies.get("access_token")
-    if not access:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    try:
-        payload = decode_jwt(access)
-        if payload.get("type") != "access":
-            raise HTTPException(status_code=401, detail="Invalid token")
-        uid = int(payload.get("sub"))
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.get(User, uid)
+async def get_me(
+    uid: int = Depends(get_current_user_id),
+    # not a replica: a lagging read would re-cache a just-invalidated profile
+    db: AsyncSession = Depends(get_db_session),
+):
+    user = await user_cache.get(db, uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
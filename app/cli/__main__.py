@@ -0,0 +1,22 @@
+"""Operational commands: ``python -m app.cli <command> [options]``."""
+
+import argparse
+import logging
+
+from app.cli import calibrate, import_users, keys, purge
+
+COMMANDS = [purge, keys, calibrate, import_users]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in COMMANDS:
+        command.register(subparsers)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
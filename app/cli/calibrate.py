@@ -0,0 +1,121 @@
+import argparse
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+from passlib.hash import argon2
+
+
+@dataclass
+class Argon2Params:
+    time_cost: int
+    memory_cost: int  # KiB
+    parallelism: int
+    verify_ms: float
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "ARGON2_TIME_COST": str(self.time_cost),
+            "ARGON2_MEMORY_COST": str(self.memory_cost),
+            "ARGON2_PARALLELISM": str(self.parallelism),
+        }
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    """Median verify latency in milliseconds for the given parameters."""
+    hasher = argon2.using(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hashed = hasher.hash("calibration password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify("calibration password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target_ms: float,
+    max_memory_kib: int,
+    parallelism: int = 1,
+    max_time_cost: int = 10,
+    samples: int = 5,
+) -> Argon2Params:
+    """Pick the costliest parameters whose verify stays within ``target_ms``.
+
+    Memory is preferred over passes (it is what makes GPU attacks expensive):
+    start at ``max_memory_kib`` with one pass, halve memory until a verify
+    fits, then add passes while it still does.
+    """
+    min_memory = 8 * parallelism  # Argon2's lower bound
+    memory = max(max_memory_kib, min_memory)
+    took = measure(1, memory, parallelism, samples)
+    while took > target_ms and memory // 2 >= min_memory:
+        memory //= 2
+        took = measure(1, memory, parallelism, samples)
+
+    # cost is roughly linear in passes: estimate, then back off until it fits
+    time_cost = max(1, min(max_time_cost, int(target_ms // max(took, 1e-3))))
+    while time_cost > 1:
+        candidate = measure(time_cost, memory, parallelism, samples)
+        if candidate <= target_ms:
+            took = candidate
+            break
+        time_cost -= 1
+    return Argon2Params(time_cost, memory, parallelism, took)
+
+
+def write_env(path: str, values: Dict[str, str]) -> None:
+    """Set ``values`` in a dotenv file, replacing existing assignments."""
+    lines = []
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = f.read().splitlines()
+    pending = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in pending:
+            lines[i] = f"{key}={pending.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in pending.items())
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "calibrate-argon2",
+        help="Benchmark this host and choose Argon2 costs for a target latency",
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=250.0, help="verify latency to aim for"
+    )
+    parser.add_argument(
+        "--max-memory-mib",
+        type=int,
+        default=256,
+        help="memory per hash upper bound; mind PASSWORD_HASH_WORKERS x this",
+    )
+    # the hashing pool already runs one hash per core
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--env-file", help="also write the settings to this file")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    params = calibrate(
+        args.target_ms,
+        args.max_memory_mib * 1024,
+        parallelism=args.parallelism,
+        max_time_cost=args.max_time_cost,
+        samples=args.samples,
+    )
+    print(f"# verify takes {params.verify_ms:.1f}ms on this host")
+    for key, value in params.env().items():
+        print(f"{key}={value}")
+    if args.env_file:
+        write_env(args.env_file, params.env())
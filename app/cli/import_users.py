@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from app.db.session import engine
+from app.services.user_import import ImportStats, import_users, read_records
+
+logger = logging.getLogger(__name__)
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "import-users",
+        help="Bulk-load users from CSV or JSON lines (email, password|password_hash)",
+    )
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="default: from the file extension (.csv, otherwise jsonl)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="hashing processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--verified", action="store_true", help="mark every imported email verified"
+    )
+    parser.set_defaults(func=run)
+
+
+def _progress(stats: ImportStats) -> None:
+    logger.info(
+        "%d read, %d imported, %d existing, %d invalid (%.0f users/s)",
+        stats.read,
+        stats.imported,
+        stats.existing,
+        stats.invalid,
+        stats.rate,
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+
+    async def _run() -> ImportStats:
+        # spawn: workers must not inherit the event loop or open connections
+        with ProcessPoolExecutor(
+            args.workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            try:
+                if args.path == "-":
+                    records = read_records(sys.stdin, fmt)
+                    return await import_users(
+                        records, executor, args.batch_size, args.verified, _progress
+                    )
+                with open(args.path, newline="", encoding="utf-8") as f:
+                    return await import_users(
+                        read_records(f, fmt),
+                        executor,
+                        args.batch_size,
+                        args.verified,
+                        _progress,
+                    )
+            finally:
+                await engine.dispose()
+
+    print(json.dumps(asyncio.run(_run()).as_dict()))
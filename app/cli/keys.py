@@ -0,0 +1,37 @@
+import argparse
+import os
+from datetime import date
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "gen-jwt-key", help="Generate a JWT signing key into JWT_KEYS_DIR"
+    )
+    parser.add_argument("--dir", required=True, help="the JWT_KEYS_DIR")
+    parser.add_argument(
+        "--kid", default=date.today().isoformat(), help="key id (default: today)"
+    )
+    parser.add_argument("--alg", choices=["EdDSA", "ES256"], default="EdDSA")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.alg == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    os.makedirs(args.dir, exist_ok=True)
+    path = os.path.join(args.dir, f"{args.kid}.pem")
+    # refuse to overwrite: tokens signed with the old key would stop verifying
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    print(path)
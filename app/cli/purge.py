@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import json
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.retention import default_policies, purge_all
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "purge", help="Delete expired tokens, old sessions and audit rows"
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=[p.table for p in default_policies()],
+        help="Only purge this table (repeatable); default: all",
+    )
+    parser.add_argument("--chunk-size", type=int, default=settings.RETENTION_CHUNK_SIZE)
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=settings.RETENTION_CHUNK_PAUSE_SECONDS,
+        help="Seconds to sleep between chunks",
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    policies = [
+        p for p in default_policies() if not args.table or p.table in args.table
+    ]
+
+    async def _run():
+        try:
+            return await purge_all(policies, args.chunk_size, args.pause)
+        finally:
+            await engine.dispose()
+
+    for result in asyncio.run(_run()):
+        print(
+            json.dumps(
+                {
+                    "table": result.table,
+                    "deleted": result.deleted,
+                    "seconds": round(result.seconds, 3),
+                }
+            )
+        )
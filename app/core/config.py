@@ -10,9 +10,30 @@ class Settings(BaseSettings):
     APP_ENV: str = Field(default="dev")
 
     SECRET_KEY: str
+    # Asymmetric JWT signing: a directory of <kid>.pem private keys (Ed25519 or
+    # P-256) and <kid>.pub.pem retired public keys. Unset: HS256 with SECRET_KEY.
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None  # default: greatest kid with a private key
+    JWT_LEGACY_HS256: bool = False  # still accept HS256 tokens while migrating
+    JWKS_MAX_AGE_SECONDS: int = 300
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Duplicate refreshes of one session within this window get the same new
+    # token pair (multi-tab browsers); 0 disables coalescing
+    REFRESH_GRACE_SECONDS: float = 10
+    # Max number of verified access tokens kept to skip repeat signature checks
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10_000
+    # /users/me profile cache: short per-worker TTL, longer shared Redis TTL
+    # (which also bounds staleness when a Redis invalidation is missed)
+    USER_CACHE_TTL_SECONDS: float = 30
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_REDIS_TTL_SECONDS: int = 60
+    # Revoked session ids remembered for one access-token lifetime
+    REVOCATION_CACHE_MAX_SIZE: int = 1_000_000
+    # Without Redis, share revocations between the workers on one host through
+    # a memory-mapped table at this path (e.g. /dev/shm/auth-revoked)
+    REVOCATION_SHM_PATH: Optional[str] = None
 
     COOKIE_SECURE: bool = False
     COOKIE_SAMESITE: str = Field(default="lax")  # lax, strict, none
@@ -26,14 +47,81 @@ class Settings(BaseSettings):
     SQLITE_PATH: str = Field(
         default="./app.db"
     )  # Used when DB_BACKEND=sqlite and DATABASE_URL not provided
+    # Comma-separated read replicas for read-only endpoints, round-robin over
+    # those passing the periodic health check; the primary serves when none do
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    DATABASE_REPLICA_CHECK_SECONDS: float = 5.0
 
     # Redis is optional; if unset, in-memory fallback will be used for simple rate limiting
     REDIS_URL: Optional[str] = None
+    # The rate limiter's own pool: short timeouts, since it can fall back
+    # locally. After REDIS_BREAKER_THRESHOLD consecutive failures it stops
+    # calling Redis until a background PING succeeds.
+    REDIS_RATE_LIMIT_MAX_CONNECTIONS: int = 20
+    REDIS_RATE_LIMIT_TIMEOUT_SECONDS: float = 0.1
+    # Pool for the other request-path callers (user cache, revocation
+    # broadcast, refresh coalescing), behind a breaker of the same settings
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_TIMEOUT_SECONDS: float = 0.25
+    REDIS_BREAKER_THRESHOLD: int = 5
+    REDIS_BREAKER_PROBE_SECONDS: float = 2.0
+
+    # Rate-limit policies as "<limit>/<window_seconds>"
+    RATE_LIMIT_LOGIN: str = "5/60"
+    RATE_LIMIT_REGISTER: str = "10/3600"
+    RATE_LIMIT_EMAIL: str = "5/3600"  # verification / password-reset emails
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 100_000  # bound for the in-memory fallback
+    # Without Redis, share limits between the workers on one host through a
+    # memory-mapped table at this path (e.g. /dev/shm/auth-ratelimit).
+    RATE_LIMIT_SHM_PATH: Optional[str] = None
+
+    # Password hashing pool: workers default to CPU count. 0 hashes on one
+    # thread inside the app process (for tests; it caps the worker at one hash).
+    # Requests beyond workers + queue size are rejected with 503.
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_QUEUE_SIZE: int = 8
+    # Argon2id cost; tune per host with `python -m app.cli calibrate-argon2`.
+    # Hashes made with other parameters are upgraded on the next login.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # Audit logging: "buffered" writes behind in bulk batches, "sync" commits
+    # each entry inside the request
+    AUDIT_MODE: Literal["sync", "buffered"] = "buffered"
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Postgres only: monthly auditlog partitions are created this far ahead
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
 
     EMAIL_FROM: str = "no-reply@example.com"
+    # Outbox delivery: "console" prints, "smtp" sends via SMTP_*
+    EMAIL_BACKEND: Literal["console", "smtp"] = "console"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = False
+    SMTP_TIMEOUT: float = 10.0
+    EMAIL_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_POLL_INTERVAL_SECONDS: float = 1.0
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: float = 5.0
     EMAIL_TOKEN_EXPIRE_HOURS: int = 24
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 2
 
+    # Retention: rows older than these are purged in chunks by
+    # `python -m app.cli purge`, or in-app every RETENTION_INTERVAL_SECONDS
+    RETENTION_EMAIL_TOKEN_DAYS: int = 7  # after expiry
+    RETENTION_SESSION_DAYS: int = 30  # after revocation / refresh expiry
+    RETENTION_AUDIT_DAYS: int = 90
+    RETENTION_OUTBOX_DAYS: int = 7  # sent or failed messages
+    RETENTION_CHUNK_SIZE: int = 1000
+    RETENTION_CHUNK_PAUSE_SECONDS: float = 0.05
+    RETENTION_INTERVAL_SECONDS: float = 0  # 0 disables the in-app runner
+
     model_config = {
         "env_file": ".env",
         "case_sensitive": False,
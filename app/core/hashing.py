@@ -0,0 +1,93 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class HashingOverloaded(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class HashingExecutor:
+    """Bounded process pool for CPU-bound password hashing.
+
+    At most ``max_workers + max_queue`` jobs are admitted at a time; anything
+    beyond that is rejected immediately with ``HashingOverloaded`` instead of
+    queueing up behind a login storm. ``max_workers=0`` hashes in this process
+    on a single background thread (never on the event loop), still subject to
+    admission control; meant for tests and tiny deployments.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.capacity = max(max_workers, 1) + max_queue
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None and self.max_workers == 0:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="hashing")
+            elif self._executor is None:
+                # spawn: forking a threaded server process is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded("Password hashing queue is full")
+        with self._count_lock:
+            self._in_flight += 1
+
+    def _release(self, _: Any = None) -> None:
+        with self._count_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        self._acquire()
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+hashing_executor = HashingExecutor(
+    max_workers=(
+        settings.PASSWORD_HASH_WORKERS
+        if settings.PASSWORD_HASH_WORKERS is not None
+        else os.cpu_count() or 1
+    ),
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
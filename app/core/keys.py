@@ -0,0 +1,133 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from app.core.config import settings
+
+PrivateKey = Union[ed25519.Ed25519PrivateKey, ec.EllipticCurvePrivateKey]
+PublicKey = Union[ed25519.Ed25519PublicKey, ec.EllipticCurvePublicKey]
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    alg: str  # "EdDSA" or "ES256"
+    public: PublicKey
+    private: Optional[PrivateKey] = None  # None for retired, verify-only keys
+
+    def to_jwk(self) -> Dict[str, Any]:
+        algorithm = OKPAlgorithm if self.alg == "EdDSA" else ECAlgorithm
+        jwk = algorithm.to_jwk(self.public, as_dict=True)
+        return {**jwk, "kid": self.kid, "alg": self.alg, "use": "sig"}
+
+
+def _alg_for(key: Union[PrivateKey, PublicKey]) -> str:
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if isinstance(key.curve, ec.SECP256R1):
+            return "ES256"
+    raise ValueError(f"Unsupported JWT key type {type(key).__name__}")
+
+
+class KeyRing:
+    """Asymmetric JWT keys selected by ``kid``.
+
+    Keys are parsed once, at load; verification is a dict lookup by the
+    token's ``kid`` header followed by a signature check with the already
+    parsed public key, pinned to that key's algorithm.
+
+    Without keys the ring falls back to HS256 with ``SECRET_KEY`` (tokens carry
+    no ``kid`` and the JWKS is empty). ``legacy_hs256`` keeps accepting such
+    tokens after switching to asymmetric keys, until they have expired.
+    """
+
+    def __init__(
+        self,
+        keys: List[SigningKey],
+        active_kid: Optional[str] = None,
+        secret: str = "",
+        legacy_hs256: bool = False,
+    ) -> None:
+        self.keys = {k.kid: k for k in keys}
+        self.secret = secret
+        self.legacy_hs256 = legacy_hs256
+        self.active: Optional[SigningKey] = None
+        if self.keys:
+            kid = active_kid or max(
+                (k.kid for k in keys if k.private is not None), default=None
+            )
+            if kid not in self.keys or self.keys[kid].private is None:
+                raise ValueError(f"No private key for active JWT kid {kid!r}")
+            self.active = self.keys[kid]
+        self._jwks = json.dumps(
+            {"keys": [k.to_jwk() for k in self.keys.values()]}, separators=(",", ":")
+        ).encode()
+
+    @classmethod
+    def from_dir(cls, path: str, active_kid: Optional[str] = None, **kwargs: Any):
+        """Load ``<kid>.pem`` private keys and ``<kid>.pub.pem`` public keys."""
+        keys = []
+        for name in sorted(os.listdir(path)):
+            with open(os.path.join(path, name), "rb") as f:
+                data = f.read()
+            if name.endswith(".pub.pem"):
+                public = serialization.load_pem_public_key(data)
+                keys.append(
+                    SigningKey(name[: -len(".pub.pem")], _alg_for(public), public)
+                )
+            elif name.endswith(".pem"):
+                private = serialization.load_pem_private_key(data, password=None)
+                keys.append(
+                    SigningKey(
+                        name[: -len(".pem")],
+                        _alg_for(private),
+                        private.public_key(),
+                        private,
+                    )
+                )
+        return cls(keys, active_kid, **kwargs)
+
+    @property
+    def jwks(self) -> bytes:
+        """The public keys as a serialized JWK Set."""
+        return self._jwks
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        if self.active is None:
+            return jwt.encode(payload, self.secret, algorithm="HS256")
+        return jwt.encode(
+            payload,
+            self.active.private,
+            algorithm=self.active.alg,
+            headers={"kid": self.active.kid},
+        )
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            if self.active is not None and not self.legacy_hs256:
+                raise jwt.InvalidTokenError("Token has no kid")
+            return jwt.decode(token, self.secret, algorithms=["HS256"])
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown kid {kid!r}")
+        return jwt.decode(token, key.public, algorithms=[key.alg])
+
+
+def load_keyring() -> KeyRing:
+    options = {"secret": settings.SECRET_KEY, "legacy_hs256": settings.JWT_LEGACY_HS256}
+    if settings.JWT_KEYS_DIR:
+        return KeyRing.from_dir(
+            settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID, **options
+        )
+    return KeyRing([], **options)
+
+
+keyring = load_keyring()
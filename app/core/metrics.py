@@ -0,0 +1,216 @@
+"""Prometheus metrics and the instrumentation that feeds them.
+
+Under gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty directory so
+``/metrics`` aggregates every worker instead of whichever one served the
+scrape.
+"""
+
+import os
+import time
+from typing import Any, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP responses by route and status",
+    ["method", "route", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time by database and statement type",
+    ["database", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash/verify CPU time in the hashing worker",
+    ["op"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+HASH_WAIT = Histogram(
+    "password_hash_wait_seconds",
+    "Time hash/verify calls spent queued for a hashing worker",
+    ["op"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate-limiter decisions by policy, outcome and backend",
+    ["policy", "decision", "backend"],
+)
+REDIS_CIRCUIT_OPEN = Gauge(
+    "redis_circuit_open",
+    "1 while the circuit breaker in front of a Redis client is open",
+    ["client"],
+    multiprocess_mode="max",
+)
+REDIS_CIRCUIT_TRIPS = Counter(
+    "redis_circuit_trips_total",
+    "Times a Redis circuit breaker has opened",
+    ["client"],
+)
+REDIS_POOL_IN_USE = Gauge(
+    "redis_pool_connections_in_use",
+    "Connections checked out of a Redis client's pool",
+    ["client"],
+    multiprocess_mode="livesum",
+)
+EMAIL_OUTBOX_DEPTH = Gauge(
+    "email_outbox_depth",
+    "Pending messages in the email outbox",
+    multiprocess_mode="max",
+)
+EMAIL_OUTBOX_LAG = Gauge(
+    "email_outbox_lag_seconds",
+    "Age of the oldest pending outbox message",
+    multiprocess_mode="max",
+)
+EMAIL_DELIVERIES = Counter(
+    "email_outbox_deliveries_total",
+    "Outbox delivery attempts by outcome",
+    ["outcome"],
+)
+USER_CACHE_LOOKUPS = Counter(
+    "user_cache_lookups_total",
+    "User cache lookups by the tier that answered (local, redis) or miss",
+    ["result"],
+)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def observe_hash(op: str, duration: float, wait: float) -> None:
+    HASH_LATENCY.labels(op).observe(duration)
+    HASH_WAIT.labels(op).observe(max(wait, 0.0))
+
+
+def record_rate_limit(key: str, allowed: bool, backend: str) -> None:
+    # keys are "<policy name>:<subject>", see app.api.deps.RateLimit
+    policy = key.partition(":")[0]
+    RATE_LIMIT_DECISIONS.labels(
+        policy, "allowed" if allowed else "denied", backend
+    ).inc()
+
+
+def record_breaker(client: str, opened: bool) -> None:
+    REDIS_CIRCUIT_OPEN.labels(client).set(1 if opened else 0)
+    if opened:
+        REDIS_CIRCUIT_TRIPS.labels(client).inc()
+
+
+def record_redis_pool(client: str, in_use: int) -> None:
+    REDIS_POOL_IN_USE.labels(client).set(in_use)
+
+
+def record_user_cache(result: str) -> None:
+    USER_CACHE_LOOKUPS.labels(result).inc()
+
+
+def record_outbox(depth: int, lag: float) -> None:
+    EMAIL_OUTBOX_DEPTH.set(depth)
+    EMAIL_OUTBOX_LAG.set(lag)
+
+
+def record_deliveries(outcome: str, count: int) -> None:
+    if count:
+        EMAIL_DELIVERIES.labels(outcome).inc(count)
+
+
+def instrument_engine(engine: Engine, database: str = "primary") -> None:
+    """Time every statement and track pool usage on a (sync) engine.
+
+    ``database`` labels its series (``primary``, ``replica0``, ...).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        DB_QUERY_LATENCY.labels(
+            database, operation if operation in _OPERATIONS else "OTHER"
+        ).observe(time.perf_counter() - started)
+
+    pool = engine.pool
+
+    def _update_pool(*_: Any) -> None:
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.labels(database).set(pool.checkedout())
+            POOL_OVERFLOW.labels(database).set(max(pool.overflow(), 0))
+
+    event.listen(engine, "checkout", _update_pool)
+    event.listen(engine, "checkin", _update_pool)
+
+
+class MetricsMiddleware:
+    """Records latency and status per route template (e.g. ``/sessions/{id}``).
+
+    Labels use the matched route's path, not the raw URL, to keep label
+    cardinality bounded; unmatched requests are grouped as ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, path).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, path, str(status)).inc()
+
+
+def render() -> Tuple[bytes, str]:
+    """The exposition payload and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
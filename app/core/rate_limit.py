@@ -1,54 +1,182 @@
+import math
 import time
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
-import redis
+import redis.asyncio as redis
 
 from app.core.config import settings
+from app.core.metrics import record_rate_limit, record_redis_pool
+from app.core.redis_client import CircuitBreaker, create_pooled_client, pool_stats
+from app.utils.cache import TTLCache
+from app.utils.shm_table import SharedExpiryTable
 
 _client: Optional[redis.Redis] = None
-_memory_store: dict[str, tuple[int, int]] = {}
+_gcra_script = None
+_shared_store: Optional[SharedExpiryTable] = None
+
+# Local GCRA state: key -> theoretical arrival time (TAT). An entry is only
+# meaningful until its TAT has passed, so it expires exactly then.
+_memory_store: TTLCache[str, float] = TTLCache(
+    maxsize=settings.RATE_LIMIT_LOCAL_MAX_KEYS
+)
+
+# Generic cell rate algorithm: one key per client holding its TAT in ms.
+# Allows `limit` requests per `window` with no burst at window edges, and does
+# the read-check-write atomically in a single round-trip.
+GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+  tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+  return {0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Allow ``limit`` requests per ``window_seconds`` for each key."""
+
+    name: str
+    limit: int
+    window_seconds: int
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitPolicy":
+        """Build a policy from a ``"<limit>/<window_seconds>"`` string."""
+        limit, window = spec.split("/", 1)
+        return cls(name=name, limit=int(limit), window_seconds=int(window))
+
+
+login_policy = RateLimitPolicy.parse("login", settings.RATE_LIMIT_LOGIN)
+register_policy = RateLimitPolicy.parse("register", settings.RATE_LIMIT_REGISTER)
+email_policy = RateLimitPolicy.parse("email", settings.RATE_LIMIT_EMAIL)
 
 
 def get_client() -> redis.Redis:
     global _client
     if _client is None:
-        if not settings.REDIS_URL:
-            raise RuntimeError("Redis URL not configured")
-        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _client = create_pooled_client(
+            settings.REDIS_RATE_LIMIT_MAX_CONNECTIONS,
+            settings.REDIS_RATE_LIMIT_TIMEOUT_SECONDS,
+        )
     return _client
 
 
-def is_allowed(key: str, limit: int, window_seconds: int) -> tuple[bool, int]:
-    """Return (allowed, remaining_seconds) using simple fixed-window counter.
+async def _ping() -> None:
+    await get_client().ping()
+
+
+breaker = CircuitBreaker(
+    "rate_limit",
+    threshold=settings.REDIS_BREAKER_THRESHOLD,
+    probe_interval=settings.REDIS_BREAKER_PROBE_SECONDS,
+    probe=_ping,
+)
+
+
+def redis_stats() -> Dict[str, Any]:
+    """Breaker and pool state of the limiter's Redis client, for monitoring."""
+    stats: Dict[str, Any] = {"breaker": breaker.stats()}
+    if _client is not None:
+        stats["pool"] = pool_stats(_client)
+    return stats
+
+
+async def shutdown() -> None:
+    global _client, _gcra_script
+    await breaker.stop()
+    if _client is not None:
+        await _client.aclose()
+        _client = _gcra_script = None
 
-    Uses Redis if configured, otherwise a best-effort in-memory store.
+
+def _get_script():
+    global _gcra_script
+    if _gcra_script is None:
+        # register_script uses EVALSHA and only falls back to EVAL on NOSCRIPT
+        _gcra_script = get_client().register_script(GCRA_LUA)
+    return _gcra_script
+
+
+def _get_shared_store() -> Optional[SharedExpiryTable]:
+    global _shared_store
+    if _shared_store is None and settings.RATE_LIMIT_SHM_PATH:
+        _shared_store = SharedExpiryTable(
+            settings.RATE_LIMIT_SHM_PATH, settings.RATE_LIMIT_LOCAL_MAX_KEYS
+        )
+    return _shared_store
+
+
+def _gcra(
+    tat: Optional[float], now: float, limit: int, window_seconds: int
+) -> tuple[Optional[float], tuple[bool, int]]:
+    """One GCRA step: (new TAT to store or None, (allowed, retry_after))."""
+    new_tat = max(tat or now, now) + window_seconds / limit
+    allow_at = new_tat - window_seconds
+    if now < allow_at:
+        return None, (False, math.ceil(allow_at - now))
+    return new_tat, (True, 0)
+
+
+def _local_is_allowed(key: str, limit: int, window_seconds: int) -> tuple[bool, int]:
+    now = time.monotonic()
+    new_tat, result = _gcra(_memory_store.get(key), now, limit, window_seconds)
+    if new_tat is not None:
+        _memory_store.set(key, new_tat, ttl=new_tat - now)
+    return result
+
+
+def _shared_is_allowed(
+    store: SharedExpiryTable, key: str, limit: int, window_seconds: int
+) -> tuple[bool, int]:
+    # wall clock: the table may outlive this process (see SharedExpiryTable)
+    now = time.time()
+    return store.update(key, now, lambda tat: _gcra(tat, now, limit, window_seconds))
+
+
+async def is_allowed(key: str, limit: int, window_seconds: int) -> tuple[bool, int]:
+    """Return (allowed, retry_after_seconds) using GCRA.
+
+    Uses Redis if configured, otherwise the host-wide shared-memory table
+    (``RATE_LIMIT_SHM_PATH``) or, failing that, a per-process in-memory store.
+    While the Redis circuit breaker is open the local stores are used
+    without trying Redis at all.
     """
-    now = int(time.time())
-    if settings.REDIS_URL:
+    if settings.REDIS_URL and breaker.allow():
         try:
-            r = get_client()
-            window_key = f"rl:{key}:{now // window_seconds}"
-            pipe = r.pipeline()
-            pipe.incr(window_key, 1)
-            pipe.expire(window_key, window_seconds)
-            count, _ = pipe.execute()
-            if int(count) > limit:
-                remaining = window_seconds - (now % window_seconds)
-                return False, remaining
-            return True, 0
+            interval_ms = max(1, window_seconds * 1000 // limit)
+            allowed, retry_ms = await _get_script()(
+                keys=[f"rl:{key}"], args=[interval_ms, window_seconds * 1000]
+            )
         except Exception:
-            # If Redis is unreachable or errors, fall back to in-memory logic below.
-            pass
+            # unreachable, slow or erroring: fall back to the local stores below
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            record_rate_limit(key, bool(allowed), "redis")
+            return bool(allowed), math.ceil(int(retry_ms) / 1000)
+        finally:
+            if _client is not None:
+                record_redis_pool("rate_limit", pool_stats(_client)["in_use"])
+
+    store = _get_shared_store()
+    if store is not None:
+        allowed, retry_after = _shared_is_allowed(store, key, limit, window_seconds)
+        record_rate_limit(key, allowed, "shm")
+        return allowed, retry_after
 
     # In-memory fallback (per-process, resets on restart)
-    win = now // window_seconds
-    local_key = f"{key}:{win}"
-    count, first_ts = _memory_store.get(local_key, (0, now))
-    count += 1
-    _memory_store[local_key] = (count, first_ts)
-    if count > limit:
-        remaining = window_seconds - (now - first_ts)
-        if remaining < 0:
-            remaining = 0
-        return False, remaining
-    return True, 0
+    allowed, retry_after = _local_is_allowed(key, limit, window_seconds)
+    record_rate_limit(key, allowed, "local")
+    return allowed, retry_after
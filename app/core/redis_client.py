@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import record_breaker, record_redis_pool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_client: Optional[redis.Redis] = None
+_request_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Shared asyncio Redis client without timeouts; raises if REDIS_URL is unset.
+
+    Only for pub/sub subscribers. Calls made while serving a request go
+    through ``call_redis`` instead.
+    """
+    global _client
+    if _client is None:
+        if not settings.REDIS_URL:
+            raise RuntimeError("Redis URL not configured")
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def create_pooled_client(max_connections: int, timeout: float) -> redis.Redis:
+    """Client on its own bounded pool where every wait is capped at ``timeout``.
+
+    For latency-critical callers with a local fallback: checking out a
+    connection, connecting and reading a reply each give up after
+    ``timeout`` seconds. Not for pub/sub, whose reads block indefinitely.
+    """
+    if not settings.REDIS_URL:
+        raise RuntimeError("Redis URL not configured")
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=max_connections,
+        timeout=timeout,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+        decode_responses=True,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def pool_stats(client: redis.Redis) -> Dict[str, int]:
+    pool = client.connection_pool
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": len(getattr(pool, "_in_use_connections", ())),
+        "idle": len(getattr(pool, "_available_connections", ())),
+    }
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until a probe says it is back.
+
+    After ``threshold`` consecutive failures the breaker opens: ``allow()``
+    returns False, so callers take their fallback immediately instead of
+    waiting out a timeout on every request. A background task runs ``probe``
+    every ``probe_interval`` seconds and closes the breaker once it succeeds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int,
+        probe_interval: float,
+        probe: Callable[[], Awaitable[Any]],
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        return not self.is_open
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold and not self.is_open:
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            record_breaker(self.name, opened=True)
+            logger.warning(
+                "%s circuit opened after %d failures", self.name, self.failures
+            )
+            self._probe_task = asyncio.create_task(self._probe_until_healthy())
+
+    def close(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        record_breaker(self.name, opened=False)
+
+    async def _probe_until_healthy(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self.probe()
+            except Exception:
+                continue
+            logger.info("%s circuit closed", self.name)
+            self.close()
+            self._probe_task = None
+            return
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "open_seconds": (
+                time.monotonic() - self.opened_at if self.opened_at else 0.0
+            ),
+        }
+
+
+def get_request_redis() -> redis.Redis:
+    global _request_client
+    if _request_client is None:
+        _request_client = create_pooled_client(
+            settings.REDIS_MAX_CONNECTIONS, settings.REDIS_TIMEOUT_SECONDS
+        )
+    return _request_client
+
+
+async def _ping() -> None:
+    await get_request_redis().ping()
+
+
+request_breaker = CircuitBreaker(
+    "request",
+    threshold=settings.REDIS_BREAKER_THRESHOLD,
+    probe_interval=settings.REDIS_BREAKER_PROBE_SECONDS,
+    probe=_ping,
+)
+
+
+async def call_redis(op: Callable[[redis.Redis], Awaitable[T]]) -> T:
+    """Run ``op`` on the timed request-path client and feed its breaker.
+
+    Callers check ``request_breaker.allow()`` first and take their local
+    fallback while it is open; errors (including timeouts) are re-raised.
+    """
+    try:
+        result = await op(get_request_redis())
+    except Exception:
+        request_breaker.record_failure()
+        raise
+    else:
+        request_breaker.record_success()
+        return result
+    finally:
+        if _request_client is not None:
+            record_redis_pool("request", pool_stats(_request_client)["in_use"])
+
+
+def request_redis_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"breaker": request_breaker.stats()}
+    if _request_client is not None:
+        stats["pool"] = pool_stats(_request_client)
+    return stats
+
+
+async def shutdown() -> None:
+    global _client, _request_client
+    await request_breaker.stop()
+    for client in (_request_client, _client):
+        if client is not None:
+            await client.aclose()
+    _client = _request_client = None
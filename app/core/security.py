@@ -1,24 +1,75 @@
 import hashlib
 import hmac
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
-import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.keys import keyring
+from app.core.metrics import observe_hash
+from app.utils.cache import TTLCache
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+T = TypeVar("T")
 
+# bcrypt is only verified (imported accounts) and rehashed to Argon2 on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
-def get_password_hash(password: str) -> str:
+# Claims of tokens whose signature has already been verified, kept until `exp`
+_verified_tokens: TTLCache[str, Dict[str, Any]] = TTLCache(
+    maxsize=settings.VERIFIED_TOKEN_CACHE_SIZE
+)
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash uses a deprecated scheme or other cost parameters."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    # runs in the hashing worker, so the duration excludes queueing
+    started = time.perf_counter()
+    return fn(*args), time.perf_counter() - started
+
+
+def _observe(op: str, submitted: float, took: float) -> None:
+    observe_hash(op, took, time.perf_counter() - submitted - took)
+
+
+# Hashing runs on the dedicated executor so it never blocks the event loop;
+# raises HashingOverloaded when the pool is saturated.
+async def get_password_hash_async(password: str) -> str:
+    submitted = time.perf_counter()
+    hashed, took = await hashing_executor.run_async(_timed, _hash, password)
+    _observe("hash", submitted, took)
+    return hashed
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    submitted = time.perf_counter()
+    ok, took = await hashing_executor.run_async(
+        _timed, _verify, plain_password, hashed_password
+    )
+    _observe("verify", submitted, took)
+    return ok
+
+
 def create_jwt_token(
     subject: str,
     expires_delta: timedelta,
@@ -34,11 +85,26 @@ def create_jwt_token(
     }
     if extra:
         payload.update(extra)
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+    return keyring.sign(payload)
 
 
 def decode_jwt(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])  # type: ignore[return-value]
+    return keyring.verify(token)
+
+
+def decode_jwt_cached(token: str) -> Dict[str, Any]:
+    """Like decode_jwt, but skips verification for recently verified tokens.
+
+    Entries expire with the token's own `exp`, so an expired token is never
+    served from the cache. The returned claims are shared; do not mutate them.
+    """
+    claims = _verified_tokens.get(token)
+    if claims is None:
+        claims = decode_jwt(token)
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            _verified_tokens.set(token, claims, ttl=ttl)
+    return claims
 
 
 def fingerprint(ip: str, user_agent: str) -> str:
@@ -0,0 +1,99 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def _is_read(clause: Any) -> bool:
+    # only plain SELECTs qualify; DML, FOR UPDATE, text() and unknowns are writes
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica until it first writes.
+
+    A replica engine is opted into per session through
+    ``info={"replica": engine}`` (see ``get_read_db``). SELECTs go there; the
+    first flush or DML statement pins the session to the primary (its normal
+    bind) for the rest of its life, so reads that follow a write in the same
+    request see it. Sessions without a replica behave like a plain Session.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw: Any) -> Engine | Connection:
+        replica: Optional[AsyncEngine] = self.info.get("replica")
+        if replica is not None:
+            if not self._flushing and _is_read(clause):
+                return replica.sync_engine
+            self.info["replica"] = None
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that passed their last health check.
+
+    A background task runs ``SELECT 1`` on every replica each ``interval``
+    seconds and takes failing ones out of rotation until they answer again;
+    ``choose`` returns ``None`` (use the primary) when none are healthy.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], interval: float) -> None:
+        self.engines = engines
+        self.interval = interval
+        self.healthy: List[AsyncEngine] = list(engines)
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def choose(self) -> Optional[AsyncEngine]:
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    async def check(self) -> None:
+        healthy = []
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), 2)
+            except Exception:
+                if engine in self.healthy:
+                    logger.warning("Replica %s failed its health check", engine.url)
+                continue
+            healthy.append(engine)
+        self.healthy = healthy
+
+    def start(self) -> None:
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": len(self.engines),
+            "healthy": [
+                engine.url.render_as_string(hide_password=True)
+                for engine in self.healthy
+            ],
+        }
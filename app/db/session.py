@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.routing import ReplicaSet, RoutingSession
 
-# Synchronous SQLAlchemy engine/session for FastAPI dependencies
 db_url = settings.DATABASE_URL
 if not db_url:
     if settings.DB_BACKEND == "sqlite":
@@ -12,18 +15,47 @@ if not db_url:
         # default to local postgres if not provided
         db_url = "postgresql+psycopg://postgres:postgres@db:5432/fastapi_auth"
 
-connect_args = {}
-if db_url.startswith("sqlite:"):
-    # Needed for SQLite when used with multiple threads
-    connect_args["check_same_thread"] = False
 
-engine = create_engine(db_url, pool_pre_ping=True, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+def to_async_url(url: str) -> str:
+    """Map a sync database URL to its asyncio driver (aiosqlite / psycopg)."""
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    elif u.get_backend_name() == "postgresql":
+        # psycopg 3 serves both sync and async from the same dialect
+        u = u.set(drivername="postgresql+psycopg")
+    return u.render_as_string(hide_password=False)
+
+
+async_db_url = to_async_url(db_url)
+
+# Async SQLAlchemy engine/session for FastAPI dependencies
+engine = create_async_engine(async_db_url, pool_pre_ping=True)
+instrument_engine(engine.sync_engine)
+replica_engines = [
+    create_async_engine(to_async_url(url.strip()), pool_pre_ping=True)
+    for url in (settings.DATABASE_REPLICA_URLS or "").split(",")
+    if url.strip()
+]
+for i, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine.sync_engine, database=f"replica{i}")
+replicas = ReplicaSet(replica_engines, interval=settings.DATABASE_REPLICA_CHECK_SECONDS)
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and in asyncio, illegal) lazy refresh
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as db:
+        yield db
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-mostly endpoints: a replica until it writes."""
+    async with SessionLocal(info={"replica": replicas.choose()}) as db:
         yield db
-    finally:
-        db.close()
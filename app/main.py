@@ -1,19 +1,85 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.api.routes.audit import router as audit_router
 from app.api.routes.auth import router as auth_router
+from app.api.routes.jwks import router as jwks_router
+from app.api.routes.sessions import admin_router as admin_sessions_router
 from app.api.routes.sessions import router as sessions_router
 from app.api.routes.users import router as users_router
+from app.core import rate_limit, redis_client
 from app.core.config import settings
+from app.core.hashing import HashingOverloaded, hashing_executor
+from app.core.metrics import MetricsMiddleware, render
+from app.db.session import engine, replicas
+from app.services.audit import audit_buffer
+from app.services.audit_partitions import ensure_partitions
+from app.services.auth import wait_for_rehashes
+from app.services.email import outbox_worker
+from app.services.retention import retention_runner
+from app.services.revocation import revocation_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_partitions()
+    audit_buffer.start()
+    await revocation_cache.warm_up()
+    revocation_cache.start()
+    outbox_worker.start()
+    retention_runner.start()
+    replicas.start()
+    yield
+    await replicas.stop()
+    await retention_runner.stop()
+    await outbox_worker.stop()
+    await revocation_cache.stop()
+    await rate_limit.shutdown()
+    await redis_client.shutdown()
+    await audit_buffer.stop()
+    await wait_for_rehashes()
+    hashing_executor.shutdown()
+    await engine.dispose()
+
 
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+    return JSONResponse(
+        {"detail": "Server busy, try again shortly"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/health")
-def health():
-    return JSONResponse({"status": "ok"})
+async def health():
+    body = {"status": "ok"}
+    if settings.REDIS_URL:
+        # degraded, not down: limits fall back to this host while it is open
+        body["rate_limit_redis"] = rate_limit.redis_stats()
+        body["request_redis"] = redis_client.request_redis_stats()
+    if outbox_worker.last_stats is not None:
+        body["email_outbox"] = outbox_worker.last_stats
+    if replicas.engines:
+        body["database_replicas"] = replicas.stats()
+    return JSONResponse(body)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    payload, content_type = render()
+    return Response(payload, media_type=content_type)
 
 
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(sessions_router)
+app.include_router(audit_router)
+app.include_router(admin_sessions_router)
+app.include_router(jwks_router)
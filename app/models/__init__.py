@@ -1,4 +1,5 @@
 from .audit_log import AuditLog
+from .email_outbox import EmailOutbox
 from .email_token import EmailToken
 from .role import Role
 from .session_token import SessionToken
@@ -10,4 +11,5 @@ __all__ = [
     "SessionToken",
     "AuditLog",
     "EmailToken",
+    "EmailOutbox",
 ]
@@ -1,18 +1,24 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
 class AuditLog(Base):
-    id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int | None] = mapped_column(
-        ForeignKey("user.id"), nullable=True, index=True
+    # On Postgres the table is range-partitioned by month on created_at (see
+    # app/services/audit_partitions.py); the primary key there is (id, created_at).
+    __table_args__ = (
+        Index("ix_auditlog_user_id_created_at", "user_id", "created_at"),
+        Index("ix_auditlog_action_created_at", "action", "created_at"),
+        Index("ix_auditlog_created_at", "created_at"),
     )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
     action: Mapped[str] = mapped_column(
-        String(50), index=True
+        String(50)
     )  # login, logout, refresh, reset, verify
     ip: Mapped[str] = mapped_column(String(64))
     user_agent: Mapped[str] = mapped_column(String(255))
@@ -1,21 +1,40 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
 class SessionToken(Base):
+    __table_args__ = (
+        # a user's sessions, newest first
+        Index("ix_sessiontoken_user_id_created_at", "user_id", "created_at", "id"),
+        # a user's active sessions
+        Index(
+            "ix_sessiontoken_active_user_id",
+            "user_id",
+            postgresql_where=text("revoked_at IS NULL"),
+            sqlite_where=text("revoked_at IS NULL"),
+        ),
+        # recently revoked sessions (revocation denylist warm-up, retention)
+        Index(
+            "ix_sessiontoken_revoked_at",
+            "revoked_at",
+            postgresql_where=text("revoked_at IS NOT NULL"),
+            sqlite_where=text("revoked_at IS NOT NULL"),
+        ),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
 
     # store hash of refresh token
-    refresh_token_hash: Mapped[str] = mapped_column(String(255), index=True)
+    refresh_token_hash: Mapped[str] = mapped_column(String(255))
 
     ip: Mapped[str] = mapped_column(String(64))
     user_agent: Mapped[str] = mapped_column(String(255))
-    device_fingerprint: Mapped[str] = mapped_column(String(64), index=True)
+    device_fingerprint: Mapped[str] = mapped_column(String(64))
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
@@ -7,7 +7,7 @@ from app.db.base import Base
 
 
 class User(Base):
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(
         String(255), unique=True, nullable=False, index=True
     )
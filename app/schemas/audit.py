@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    user_id: int | None
+    action: str
+    ip: str
+    user_agent: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AuditPage(BaseModel):
+    items: list[AuditLogOut]
+    next_cursor: str | None = None
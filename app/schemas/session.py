@@ -13,3 +13,20 @@ class SessionOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SessionPage(BaseModel):
+    items: list[SessionOut]
+    next_cursor: str | None = None
+
+
+class SessionRevokeIn(BaseModel):
+    """Revoke every active session created in ``[created_after, created_before)``."""
+
+    created_before: datetime
+    created_after: datetime | None = None
+    user_id: int | None = None
+
+
+class RevokedOut(BaseModel):
+    revoked: int
@@ -1,11 +1,292 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Row, Select, event, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db.session import SessionLocal, replicas
 from app.models import AuditLog
+from app.utils.cursor import Cursor
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """Write-behind buffer that bulk-inserts audit rows.
+
+    Entries are queued in-process and flushed with one bulk INSERT when
+    ``batch_size`` entries are pending or ``flush_interval`` seconds have passed
+    since the first pending entry. ``put`` waits when the queue is full, which
+    pushes back on request handlers instead of growing memory without bound;
+    ``put_nowait`` (used from commit hooks, which cannot wait) hands a full
+    queue's overflow to a task that does.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue[Optional[dict[str, Any]]]] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._waiting: Set[asyncio.Task[None]] = set()
+        self.retries = 3
+        self.retry_delay = 0.1
+        self.flushed = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher, then drain and flush everything still queued."""
+        if self._task is None:
+            return
+        assert self._queue is not None
+        if self._waiting:
+            await asyncio.gather(*self._waiting)
+        await self._queue.put(None)  # sentinel: flush the current batch and exit
+        await self._task
+        self._task = None
+        await self._drain()
+
+    async def put(self, entry: dict[str, Any]) -> None:
+        assert self._queue is not None
+        await self._queue.put(entry)
+
+    def put_nowait(self, entry: dict[str, Any]) -> None:
+        if self._queue is None:
+            self.dropped += 1
+            logger.warning("Audit buffer not started; dropping %r", entry)
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            task = asyncio.get_running_loop().create_task(self.put(entry))
+            self._waiting.add(task)
+            task.add_done_callback(self._waiting.discard)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _drain(self) -> None:
+        assert self._queue is not None
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                entry = self._queue.get_nowait()
+                if entry is not None:
+                    batch.append(entry)
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        """Insert ``batch``, retrying transient errors with backoff.
+
+        An integrity error (say, the user was deleted since) retries the batch
+        row by row so only the offending entries are lost.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                await self._insert(batch)
+            except IntegrityError:
+                await self._insert_rows(batch)
+                return
+            except Exception:
+                if attempt == self.retries:
+                    self.dropped += len(batch)
+                    logger.exception("Failed to flush %d audit entries", len(batch))
+                    return
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+            else:
+                self.flushed += len(batch)
+                return
+
+    async def _insert(self, batch: list[dict[str, Any]]) -> None:
+        async with SessionLocal() as db:
+            await db.execute(insert(AuditLog), batch)
+            await db.commit()
+
+    async def _insert_rows(self, batch: list[dict[str, Any]]) -> None:
+        rejected = 0
+        try:
+            async with SessionLocal() as db:
+                for entry in batch:
+                    try:
+                        async with db.begin_nested():
+                            await db.execute(insert(AuditLog), [entry])
+                    except IntegrityError as e:
+                        rejected += 1
+                        logger.warning("Dropping audit entry %r: %s", entry, e.orig)
+                await db.commit()
+        except Exception:
+            self.dropped += len(batch)
+            logger.exception("Failed to flush %d audit entries", len(batch))
+            return
+        self.flushed += len(batch) - rejected
+        self.dropped += rejected
+
 
+audit_buffer = AuditBuffer(
+    max_size=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
 
-def log_action(
-    db: Session, *, user_id: int | None, action: str, ip: str, user_agent: str
+
+_PENDING = "audit_entries"  # db.info key of entries awaiting the commit
+
+
+async def log_action(
+    db: AsyncSession, *, user_id: int | None, action: str, ip: str, user_agent: str
 ) -> None:
+    """Record an audit entry once the caller's transaction commits.
+
+    In buffered mode the entry waits in ``db.info`` and is queued for a bulk
+    write by the session's commit hook, so a rolled-back request logs nothing;
+    otherwise it is added to ``db`` and written by the caller's commit, in the
+    same transaction as the change it describes.
+    """
+    if settings.AUDIT_MODE == "buffered" and audit_buffer.running:
+        if not db.in_transaction():
+            await db.begin()  # so a rollback before any query discards the entry
+        db.info.setdefault(_PENDING, []).append(
+            {
+                "user_id": user_id,
+                "action": action,
+                "ip": ip,
+                "user_agent": user_agent,
+                "created_at": datetime.utcnow(),
+            }
+        )
+        return
     entry = AuditLog(user_id=user_id, action=action, ip=ip, user_agent=user_agent)
     db.add(entry)
-    db.commit()
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed(session: Session) -> None:
+    if session.in_nested_transaction():  # released a SAVEPOINT, not the commit
+        return
+    for entry in session.info.pop(_PENDING, ()):
+        audit_buffer.put_nowait(entry)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None:  # not just a SAVEPOINT
+        session.info.pop(_PENDING, None)
+
+
+AUDIT_COLUMNS = (
+    AuditLog.id,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.ip,
+    AuditLog.user_agent,
+    AuditLog.created_at,
+)
+
+
+@dataclass
+class AuditFilter:
+    user_id: Optional[int] = None
+    action: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def select(self) -> Select:
+        """Matching rows, newest first.
+
+        A time range lets Postgres prune partitions; user and action filters
+        use the (user_id, created_at) and (action, created_at) indexes.
+        """
+        stmt = select(*AUDIT_COLUMNS)
+        if self.user_id is not None:
+            stmt = stmt.where(AuditLog.user_id == self.user_id)
+        if self.action is not None:
+            stmt = stmt.where(AuditLog.action == self.action)
+        if self.since is not None:
+            stmt = stmt.where(AuditLog.created_at >= self.since)
+        if self.until is not None:
+            stmt = stmt.where(AuditLog.created_at < self.until)
+        return stmt.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
+
+async def query_audit(
+    db: AsyncSession,
+    filters: AuditFilter,
+    *,
+    limit: int = 100,
+    after: Optional[Cursor] = None,
+) -> Tuple[Sequence[Row], Optional[Cursor]]:
+    """One keyset page of audit rows and the cursor of the next page."""
+    stmt = filters.select()
+    if after is not None:
+        stmt = stmt.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*after))
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], (last.created_at, last.id)
+
+
+async def export_audit(
+    filters: AuditFilter, batch_size: int = 1000
+) -> AsyncIterator[str]:
+    """Yield matching rows as NDJSON, ``batch_size`` rows at a time.
+
+    Rows come from a server-side cursor on a dedicated session, so memory stays
+    flat however large the export; the session lives as long as the response
+    body is being streamed. It reads from a replica when one is available.
+    """
+    async with SessionLocal(info={"replica": replicas.choose()}) as db:
+        result = await db.stream(
+            filters.select().execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield "".join(
+                json.dumps({**row._asdict(), "created_at": row.created_at.isoformat()})
+                + "\n"
+                for row in rows
+            )
@@ -0,0 +1,138 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT = "auditlog"
+_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    year, month = divmod(dt.month - 1 + months, 12)
+    return datetime(dt.year + year, month + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT}_p{start:%Y%m}"
+
+
+def partition_bounds(name: str) -> Optional[Tuple[datetime, datetime]]:
+    """``[start, end)`` of a monthly partition, or None for other tables."""
+    m = _NAME.match(name)
+    if not m:
+        return None
+    start = datetime(int(m.group(1)), int(m.group(2)), 1)
+    return start, add_months(start, 1)
+
+
+async def _is_partitioned(conn: AsyncConnection) -> bool:
+    relkind = await conn.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": PARENT},
+    )
+    return relkind == "p"
+
+
+async def _partitions(conn: AsyncConnection) -> List[str]:
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t)"
+        ),
+        {"t": PARENT},
+    )
+    return [name for (name,) in rows]
+
+
+async def ensure_partitions(
+    now: Optional[datetime] = None, months_ahead: Optional[int] = None
+) -> List[str]:
+    """Create monthly partitions from this month through ``months_ahead``.
+
+    No-op unless ``auditlog`` is a partitioned Postgres table. Rows outside
+    every partition land in ``auditlog_default``, so a missed run never loses
+    audit entries.
+    """
+    now = now or datetime.utcnow()
+    if months_ahead is None:
+        months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD
+    created: List[str] = []
+    if engine.dialect.name != "postgresql":
+        return created
+    async with engine.connect() as conn:
+        if not await _is_partitioned(conn):
+            return []
+        existing = set(await _partitions(conn))
+        for i in range(months_ahead + 1):
+            start = add_months(month_start(now), i)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            try:
+                await conn.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF {PARENT} "
+                        f"FOR VALUES FROM ('{start:%Y-%m-%d}') "
+                        f"TO ('{add_months(start, 1):%Y-%m-%d}')"
+                    )
+                )
+                await conn.commit()
+                created.append(name)
+            except DBAPIError:
+                # e.g. the default partition already holds rows for this month
+                await conn.rollback()
+                logger.warning("Could not create partition %s", name, exc_info=True)
+    return created
+
+
+async def drop_partitions_before(cutoff: datetime) -> List[str]:
+    """Detach and drop monthly partitions whose rows are all older than ``cutoff``.
+
+    Retiring a month is a catalog change rather than a bulk DELETE: no dead
+    tuples, no vacuum debt. The short ACCESS EXCLUSIVE lock DETACH takes on the
+    parent is bounded by ``lock_timeout`` so it never queues behind long
+    queries; a partition that times out is retried on the next run.
+    """
+    dropped: List[str] = []
+    if engine.dialect.name != "postgresql":
+        return dropped
+    async with engine.connect() as conn:
+        if not await _is_partitioned(conn):
+            return []
+        for name in sorted(await _partitions(conn)):
+            bounds = partition_bounds(name)
+            if bounds is None or bounds[1] > cutoff:
+                continue
+            try:
+                await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+                await conn.execute(
+                    text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+                )
+                await conn.execute(text(f"DROP TABLE {name}"))
+                await conn.commit()
+                dropped.append(name)
+            except DBAPIError:
+                await conn.rollback()
+                logger.warning("Could not drop partition %s", name, exc_info=True)
+    if dropped:
+        logger.info("Dropped audit partitions %s", ", ".join(dropped))
+    return dropped
+
+
+async def maintain_partitions(now: datetime, cutoff: datetime) -> None:
+    await ensure_partitions(now)
+    await drop_partitions_before(cutoff)
@@ -1,24 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import secrets
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Optional, Set, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.hashing import HashingOverloaded
 from app.core.security import (
     create_jwt_token,
     fingerprint,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
 )
+from app.db.session import SessionLocal
 from app.models import EmailToken, SessionToken, User
+from app.services.audit import log_action
+from app.services.email import get_email_service, outbox_worker
+from app.services.refresh import refresh_coalescer
+from app.services.revocation import revocation_cache
+
+logger = logging.getLogger(__name__)
 
 ACCESS_TTL = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 REFRESH_TTL = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
+# strong references to in-flight rehashes (the loop only keeps weak ones)
+_rehash_tasks: Set[asyncio.Task[None]] = set()
+
 
 def _random_token(n: int = 48) -> str:
     return secrets.token_urlsafe(n)
@@ -31,79 +46,180 @@ def _hash_refresh(raw: str) -> str:
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-def register(db: Session, email: str, password: str) -> User:
-    if db.scalar(select(User).where(User.email == email)):
+async def register(
+    db: AsyncSession, email: str, password: str, ip: str, user_agent: str
+) -> Tuple[User, EmailToken]:
+    """Create a user, its verification email and audit entry in one commit.
+
+    An indexed existence check runs first so a duplicate costs no Argon2 hash;
+    the email index still decides a race between concurrent registrations.
+    """
+    if await db.scalar(select(User.id).where(User.email == email)) is not None:
+        raise ValueError("Email already registered")
+    password_hash = await get_password_hash_async(password)
+    try:
+        user = await db.scalar(
+            insert(User)
+            .values(email=email, password_hash=password_hash)
+            .returning(User)
+        )
+    except IntegrityError:
+        await db.rollback()
         raise ValueError("Email already registered")
-    user = User(email=email, password_hash=get_password_hash(password))
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    et = request_email_token(
+        db,
+        user,
+        purpose="verify_email",
+        expires_at=datetime.utcnow()
+        + timedelta(hours=settings.EMAIL_TOKEN_EXPIRE_HOURS),
+    )
+    get_email_service().send_verification(db, user.email, et.token)
+    await log_action(
+        db, user_id=user.id, action="register", ip=ip, user_agent=user_agent
+    )
+    await db.commit()
+    outbox_worker.notify()
+    return user, et
 
 
-def create_session(
-    db: Session, user: User, ip: str, user_agent: str
+async def create_session(
+    db: AsyncSession, user_id: int, ip: str, user_agent: str
 ) -> Tuple[str, str, SessionToken]:
+    """Insert a session row (INSERT ... RETURNING) and mint its token pair.
+
+    Does not commit; the caller owns the transaction.
+    """
     rid = _random_token(32)
     rhash = _hash_refresh(rid)
     fp = fingerprint(ip, user_agent)
 
-    st = SessionToken(
-        user_id=user.id,
-        refresh_token_hash=rhash,
-        ip=ip,
-        user_agent=user_agent,
-        device_fingerprint=fp,
+    st = await db.scalar(
+        insert(SessionToken)
+        .values(
+            user_id=user_id,
+            refresh_token_hash=rhash,
+            ip=ip,
+            user_agent=user_agent,
+            device_fingerprint=fp,
+        )
+        .returning(SessionToken)
     )
-    db.add(st)
-    db.commit()
-    db.refresh(st)
 
-    access = create_jwt_token(str(user.id), ACCESS_TTL, "access")
-    refresh = create_jwt_token(str(user.id), REFRESH_TTL, "refresh", {"sid": st.id})
+    access = create_jwt_token(str(user_id), ACCESS_TTL, "access", {"sid": st.id})
+    refresh = create_jwt_token(str(user_id), REFRESH_TTL, "refresh", {"sid": st.id})
     # note: raw rid is not stored; we use JWT as refresh cookie and store hash separately
     return access, refresh, st
 
 
-def login(
-    db: Session, email: str, password: str, ip: str, user_agent: str
+async def login(
+    db: AsyncSession, email: str, password: str, ip: str, user_agent: str
 ) -> Tuple[str, str, SessionToken]:
-    user = db.scalar(select(User).where(User.email == email))
-    if not user or not verify_password(password, user.password_hash):
+    user = await db.scalar(select(User).where(User.email == email))
+    if not user or not await verify_password_async(password, user.password_hash):
         raise ValueError("Invalid credentials")
-    return create_session(db, user, ip, user_agent)
+    access, refresh, st = await create_session(db, user.id, ip, user_agent)
+    await log_action(db, user_id=user.id, action="login", ip=ip, user_agent=user_agent)
+    await db.commit()
+    if password_needs_rehash(user.password_hash):
+        task = asyncio.create_task(_rehash(user.id, user.password_hash, password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+    return access, refresh, st
 
 
-def rotate_refresh(
-    db: Session, user_id: int, session_id: int, ip: str, user_agent: str
+async def _rehash(user_id: int, old_hash: str, password: str) -> None:
+    """Upgrade a hash made with old parameters, off the login's critical path.
+
+    The UPDATE only applies if the stored hash is still ``old_hash``, so a
+    password change (or a concurrent rehash) in the meantime wins. Skipped
+    under hashing backpressure; the next login tries again.
+    """
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with SessionLocal() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+    except HashingOverloaded:
+        return
+    except Exception:
+        logger.exception("Password rehash failed for user %s", user_id)
+
+
+async def wait_for_rehashes() -> None:
+    """Let in-flight rehashes finish (shutdown, tests)."""
+    if _rehash_tasks:
+        await asyncio.gather(*_rehash_tasks, return_exceptions=True)
+
+
+async def rotate_refresh(
+    db: AsyncSession, user_id: int, session_id: int, ip: str, user_agent: str
 ) -> Tuple[str, str, SessionToken]:
-    st = db.get(SessionToken, session_id)
-    if not st or st.user_id != user_id or st.revoked_at is not None:
+    """Revoke a session and issue its replacement in one transaction.
+
+    The revocation is a conditional UPDATE (compare-and-swap on
+    ``revoked_at IS NULL``), so of several concurrent refreshes of the same
+    token exactly one wins; the others see no row and are rejected.
+    """
+    revoked = await db.scalar(
+        update(SessionToken)
+        .where(
+            SessionToken.id == session_id,
+            SessionToken.user_id == user_id,
+            SessionToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+        .returning(SessionToken.id)
+        .execution_options(synchronize_session=False)
+    )
+    if revoked is None:
+        await db.rollback()
         raise ValueError("Invalid session")
-    # revoke old
-    st.revoked_at = datetime.utcnow()
-    db.add(st)
-    db.commit()
-    # create new
-    user = db.get(User, user_id)
-    return create_session(db, user, ip, user_agent)
+    access, refresh, new_st = await create_session(db, user_id, ip, user_agent)
+    await log_action(
+        db, user_id=user_id, action="refresh", ip=ip, user_agent=user_agent
+    )
+    await db.commit()
+    # access tokens minted for the superseded session stop working as well
+    await revocation_cache.revoke([session_id])
+    return access, refresh, new_st
+
+
+async def refresh_tokens(
+    db: AsyncSession, user_id: int, session_id: int, ip: str, user_agent: str
+) -> Tuple[str, str]:
+    """Rotate a session, coalescing duplicate refreshes of the same ``sid``."""
+
+    async def rotate() -> Tuple[str, str]:
+        access, refresh, _ = await rotate_refresh(
+            db, user_id, session_id, ip, user_agent
+        )
+        return access, refresh
+
+    return await refresh_coalescer.run(session_id, fingerprint(ip, user_agent), rotate)
 
 
 def request_email_token(
-    db: Session, user: User, purpose: str, expires_at: datetime
+    db: AsyncSession, user: User, purpose: str, expires_at: datetime
 ) -> EmailToken:
+    """Stage a new email token on the session; the caller commits."""
     token = _random_token(32)
     et = EmailToken(
         user_id=user.id, token=token, purpose=purpose, expires_at=expires_at
     )
     db.add(et)
-    db.commit()
-    db.refresh(et)
     return et
 
 
-def consume_email_token(db: Session, token: str, purpose: str) -> Optional[EmailToken]:
-    et = db.scalar(
+async def consume_email_token(
+    db: AsyncSession, token: str, purpose: str
+) -> Optional[EmailToken]:
+    """Mark a valid token as used; the caller commits."""
+    et = await db.scalar(
         select(EmailToken).where(
             EmailToken.token == token, EmailToken.purpose == purpose
         )
@@ -114,6 +230,4 @@ def consume_email_token(db: Session, token: str, purpose: str) -> Optional[Email
         return None
     et.used = True
     db.add(et)
-    db.commit()
-    db.refresh(et)
     return et
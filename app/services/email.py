@@ -1,14 +1,316 @@
+import asyncio
+import logging
+import random
+import smtplib
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import record_deliveries, record_outbox
+from app.db.session import SessionLocal
+from app.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
 class EmailService:
-    """Stub email service. Replace with SendGrid/SES/etc."""
+    """Renders transactional emails and stages them on the outbox.
+
+    Messages are written to ``emailoutbox`` on the caller's session, so they
+    commit (or roll back) together with the token they carry; the
+    ``OutboxWorker`` delivers them out of band.
+    """
 
-    def send_verification(self, to: str, token: str) -> None:
-        # TODO: integrate provider
-        print(f"[EMAIL] Verify {to}: token={token}")
+    def send_verification(self, db: AsyncSession, to: str, token: str) -> EmailOutbox:
+        return self._queue(
+            db,
+            to,
+            "Verify your email",
+            f"Use this token to verify your email address: {token}",
+        )
 
-    def send_password_reset(self, to: str, token: str) -> None:
-        # TODO: integrate provider
-        print(f"[EMAIL] Reset {to}: token={token}")
+    def send_password_reset(self, db: AsyncSession, to: str, token: str) -> EmailOutbox:
+        return self._queue(
+            db,
+            to,
+            "Reset your password",
+            f"Use this token to reset your password: {token}",
+        )
+
+    def _queue(self, db: AsyncSession, to: str, subject: str, body: str) -> EmailOutbox:
+        msg = EmailOutbox(recipient=to, subject=subject, body=body)
+        db.add(msg)
+        return msg
 
 
 def get_email_service() -> EmailService:
     return EmailService()
+
+
+class EmailTransport(Protocol):
+    def send(self, msg: EmailOutbox) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class ConsoleTransport:
+    """Prints messages instead of delivering them (development default)."""
+
+    def send(self, msg: EmailOutbox) -> None:
+        print(f"[EMAIL] To {msg.recipient}: {msg.subject}\n{msg.body}")
+
+    def close(self) -> None:
+        pass
+
+
+class SMTPTransport:
+    """Delivers over SMTP, keeping one connection open across messages."""
+
+    def __init__(self) -> None:
+        self._conn: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+        )
+        if settings.SMTP_STARTTLS:
+            conn.starttls()
+        if settings.SMTP_USERNAME:
+            conn.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD or "")
+        return conn
+
+    def send(self, msg: EmailOutbox) -> None:
+        message = EmailMessage()
+        message["From"] = settings.EMAIL_FROM
+        message["To"] = msg.recipient
+        message["Subject"] = msg.subject
+        message.set_content(msg.body)
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            self._conn.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # idle connection was dropped by the server; retry once on a new one
+            self._conn = self._connect()
+            self._conn.send_message(message)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except smtplib.SMTPException:
+                pass
+            self._conn = None
+
+
+def get_transport() -> EmailTransport:
+    if settings.EMAIL_BACKEND == "smtp":
+        return SMTPTransport()
+    return ConsoleTransport()
+
+
+def _deliver(
+    transport: EmailTransport, batch: List[EmailOutbox]
+) -> Tuple[List[int], List[Tuple[EmailOutbox, str]]]:
+    sent_ids: List[int] = []
+    failures: List[Tuple[EmailOutbox, str]] = []
+    for msg in batch:
+        try:
+            transport.send(msg)
+            sent_ids.append(msg.id)
+        except Exception as e:
+            failures.append((msg, repr(e)[:500]))
+    return sent_ids, failures
+
+
+class OutboxWorker:
+    """Pool of tasks draining ``emailoutbox`` in batches.
+
+    Each task claims up to ``batch_size`` due messages by pushing their
+    ``next_attempt_at`` forward by a lease (``FOR UPDATE SKIP LOCKED`` on
+    Postgres, so several processes can drain concurrently), delivers them over
+    its own long-lived transport, then marks them sent or schedules a retry
+    with exponential backoff. Messages are given up after ``max_attempts``.
+
+    The lease outlasts a worst-case batch (every message timing out on send,
+    reconnect and resend) so a slow provider never lets another worker
+    claim, and send again, a batch still in flight. Queue depth and lag are
+    refreshed every ``stats_interval`` seconds for ``/metrics`` and
+    ``/health``.
+    """
+
+    stats_interval = 15.0
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_base: float,
+        send_timeout: float = 10.0,
+    ) -> None:
+        self.lease = timedelta(seconds=batch_size * 3 * send_timeout + 60)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._tasks: List[asyncio.Task[None]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_stats: Optional[Dict[str, float]] = None
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._report()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after committing new messages."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stats(self) -> Dict[str, float]:
+        """Queue depth and lag (age in seconds of the oldest pending message)."""
+        async with SessionLocal() as db:
+            depth, oldest = (
+                await db.execute(
+                    select(func.count(), func.min(EmailOutbox.created_at)).where(
+                        EmailOutbox.status == "pending"
+                    )
+                )
+            ).one()
+        lag = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        record_outbox(depth, lag)
+        self.last_stats = {
+            "depth": depth,
+            "lag_seconds": lag,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+        return self.last_stats
+
+    async def _report(self) -> None:
+        while True:
+            try:
+                await self.stats()
+            except Exception:
+                logger.warning("Email outbox stats query failed", exc_info=True)
+            await asyncio.sleep(self.stats_interval)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        transport = get_transport()
+        try:
+            while True:
+                try:
+                    processed = await self.process_batch(transport)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Email outbox batch failed")
+                    processed = 0
+                if processed < self.batch_size:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), timeout=self.poll_interval
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            transport.close()
+
+    async def _claim(self) -> List[EmailOutbox]:
+        now = datetime.utcnow()
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with SessionLocal() as db:
+            rows = await db.scalars(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due), EmailOutbox.next_attempt_at <= now)
+                .values(
+                    next_attempt_at=now + self.lease,
+                    attempts=EmailOutbox.attempts + 1,
+                )
+                .returning(EmailOutbox)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = list(rows)
+            await db.commit()
+        return claimed
+
+    async def process_batch(self, transport: EmailTransport) -> int:
+        """Claim and deliver one batch; returns the number of messages claimed."""
+        batch = await self._claim()
+        if not batch:
+            return 0
+        # one thread hop per batch; the transport reuses its connection
+        sent_ids, failures = await asyncio.to_thread(_deliver, transport, batch)
+
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            if sent_ids:
+                await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for msg, error in failures:
+                if msg.attempts >= self.max_attempts:
+                    values = {"status": "failed", "last_error": error}
+                    self.failed += 1
+                    record_deliveries("failed", 1)
+                else:
+                    values = {
+                        "next_attempt_at": now + self._backoff(msg.attempts),
+                        "last_error": error,
+                    }
+                    self.retried += 1
+                    record_deliveries("retried", 1)
+                await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == msg.id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        self.sent += len(sent_ids)
+        record_deliveries("sent", len(sent_ids))
+        return len(batch)
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.retry_base * 2 ** (attempts - 1), 3600)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+outbox_worker = OutboxWorker(
+    workers=settings.EMAIL_WORKERS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    poll_interval=settings.EMAIL_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+    send_timeout=settings.SMTP_TIMEOUT,
+)
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.redis_client import call_redis, request_breaker
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TokenPair = Tuple[str, str]
+RotateFn = Callable[[], Awaitable[TokenPair]]
+
+
+class RefreshCoalescer:
+    """Single-flight refresh rotation keyed by session id (``sid``).
+
+    Concurrent refreshes of the same session in this process share one
+    rotation, and for ``grace_seconds`` afterwards a repeated refresh with the
+    old token receives the same freshly minted pair instead of being rejected.
+    Results are only handed out to the device (fingerprint) that minted them.
+    """
+
+    def __init__(self, grace_seconds: float, maxsize: int = 10_000) -> None:
+        self.grace_seconds = grace_seconds
+        self._inflight: dict[int, asyncio.Future[Tuple[str, TokenPair]]] = {}
+        self._recent: TTLCache[int, Tuple[str, TokenPair]] = TTLCache(
+            maxsize=maxsize, ttl=grace_seconds
+        )
+
+    async def run(self, sid: int, fp: str, rotate: RotateFn) -> TokenPair:
+        if self.grace_seconds <= 0:
+            return await rotate()
+        recent = self._recent.get(sid)
+        if recent is not None:
+            return self._check(recent, fp)
+        inflight = self._inflight.get(sid)
+        if inflight is not None:
+            return self._check(await asyncio.shield(inflight), fp)
+
+        fut: asyncio.Future[Tuple[str, TokenPair]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[sid] = fut
+        try:
+            result = await self._rotate_shared(sid, fp, rotate)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved: there may be no followers
+            raise
+        else:
+            self._recent.set(sid, result)
+            fut.set_result(result)
+        finally:
+            del self._inflight[sid]
+        return self._check(result, fp)
+
+    async def _rotate_shared(
+        self, sid: int, fp: str, rotate: RotateFn
+    ) -> Tuple[str, TokenPair]:
+        return fp, await rotate()
+
+    @staticmethod
+    def _check(result: Tuple[str, TokenPair], fp: str) -> TokenPair:
+        owner_fp, pair = result
+        if owner_fp != fp:
+            raise ValueError("Invalid session")
+        return pair
+
+
+class RedisRefreshCoalescer(RefreshCoalescer):
+    """Coalesces refreshes across workers through Redis.
+
+    The first worker takes a short ``SET NX`` lock on the session and publishes
+    the minted pair under ``refresh:<sid>`` for the grace window; other workers
+    poll for that result instead of rotating again. If the lock is released
+    without a result (the holder's rotation failed), waiters stop polling and
+    rotate themselves, which fails the same way for a bad token. Redis errors
+    degrade to a plain local rotation.
+    """
+
+    lock_ttl_ms = 5000
+    poll_interval = 0.05
+
+    async def _rotate_shared(
+        self, sid: int, fp: str, rotate: RotateFn
+    ) -> Tuple[str, TokenPair]:
+        if not request_breaker.allow():
+            return fp, await rotate()
+        key = f"refresh:{sid}"
+        locked = False
+        try:
+            shared = await call_redis(lambda r: r.get(key))
+            if shared is None:
+                locked = bool(
+                    await call_redis(
+                        lambda r: r.set(f"{key}:lock", 1, nx=True, px=self.lock_ttl_ms)
+                    )
+                )
+                if not locked:
+                    shared = await self._wait_for(key)
+        except Exception:
+            logger.warning("Refresh coalescing via Redis unavailable", exc_info=True)
+            return fp, await rotate()
+        if shared is not None:
+            data = json.loads(shared)
+            return data["fp"], (data["access"], data["refresh"])
+
+        try:
+            pair = await rotate()
+            payload = json.dumps({"fp": fp, "access": pair[0], "refresh": pair[1]})
+            await call_redis(
+                lambda r: r.set(key, payload, px=int(self.grace_seconds * 1000))
+            )
+            return fp, pair
+        except redis.RedisError:
+            logger.warning("Failed to publish refresh result", exc_info=True)
+            return fp, pair
+        finally:
+            if locked:
+                try:
+                    await call_redis(lambda r: r.delete(f"{key}:lock"))
+                except redis.RedisError:
+                    pass
+
+    async def _wait_for(self, key: str) -> Optional[str]:
+        """The holder's result, or None once its lock is gone without one."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl_ms / 1000
+        while loop.time() < deadline and request_breaker.allow():
+            await asyncio.sleep(self.poll_interval)
+            shared, lock = await call_redis(lambda r: r.mget(key, f"{key}:lock"))
+            if shared is not None or lock is None:
+                return shared
+        return None
+
+
+refresh_coalescer: RefreshCoalescer = (
+    RedisRefreshCoalescer(settings.REFRESH_GRACE_SECONDS)
+    if settings.REDIS_URL
+    else RefreshCoalescer(settings.REFRESH_GRACE_SECONDS)
+)
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Optional, Type
+
+from sqlalchemy import ColumnElement, and_, delete, or_, select
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models import AuditLog, EmailOutbox, EmailToken, SessionToken
+from app.services.audit_partitions import maintain_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Rows of ``model`` matching ``expired(now)`` may be deleted.
+
+    ``prepare(now)``, if set, runs first and may retire whole ranges more
+    cheaply (e.g. dropping partitions); the chunked delete handles the rest.
+    """
+
+    model: Type[Base]
+    expired: Callable[[datetime], ColumnElement[bool]]
+    prepare: Optional[Callable[[datetime], Awaitable[None]]] = None
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+
+@dataclass
+class PurgeResult:
+    table: str
+    deleted: int
+    seconds: float
+
+
+def default_policies() -> List[RetentionPolicy]:
+    refresh_ttl = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    session_keep = timedelta(days=settings.RETENTION_SESSION_DAYS)
+    audit_keep = timedelta(days=settings.RETENTION_AUDIT_DAYS)
+    return [
+        RetentionPolicy(
+            EmailToken,
+            lambda now: EmailToken.expires_at
+            < now - timedelta(days=settings.RETENTION_EMAIL_TOKEN_DAYS),
+        ),
+        RetentionPolicy(
+            SessionToken,
+            # revoked, or whose refresh token has expired, for a while
+            lambda now: or_(
+                SessionToken.revoked_at < now - session_keep,
+                SessionToken.created_at < now - refresh_ttl - session_keep,
+            ),
+        ),
+        RetentionPolicy(
+            AuditLog,
+            lambda now: AuditLog.created_at < now - audit_keep,
+            prepare=lambda now: maintain_partitions(now, now - audit_keep),
+        ),
+        RetentionPolicy(
+            EmailOutbox,
+            lambda now: and_(
+                EmailOutbox.status != "pending",
+                EmailOutbox.created_at
+                < now - timedelta(days=settings.RETENTION_OUTBOX_DAYS),
+            ),
+        ),
+    ]
+
+
+async def purge(
+    policy: RetentionPolicy,
+    chunk_size: int,
+    now: Optional[datetime] = None,
+    pause: float = 0.0,
+) -> PurgeResult:
+    """Delete expired rows in chunks of ``chunk_size``, walking the primary key.
+
+    Each chunk is its own short transaction (one DELETE ... WHERE id IN
+    (SELECT ... ORDER BY id LIMIT n) RETURNING id), so locks are held briefly
+    and the scan resumes after the last deleted id instead of rescanning.
+    """
+    model: Any = policy.model
+    now = now or datetime.utcnow()
+    started = time.perf_counter()
+    if policy.prepare is not None:
+        await policy.prepare(now)
+    deleted = 0
+    last_id = 0
+    while True:
+        chunk = (
+            select(model.id)
+            .where(policy.expired(now), model.id > last_id)
+            .order_by(model.id)
+            .limit(chunk_size)
+        )
+        async with SessionLocal() as db:
+            ids = list(
+                await db.scalars(
+                    delete(model)
+                    .where(model.id.in_(chunk))
+                    .returning(model.id)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+            await db.commit()
+        if not ids:
+            break
+        deleted += len(ids)
+        last_id = max(ids)
+        if pause:
+            await asyncio.sleep(pause)
+    return PurgeResult(policy.table, deleted, time.perf_counter() - started)
+
+
+async def purge_all(
+    policies: Optional[List[RetentionPolicy]] = None,
+    chunk_size: Optional[int] = None,
+    pause: float = 0.0,
+) -> List[PurgeResult]:
+    now = datetime.utcnow()
+    results = []
+    for policy in policies if policies is not None else default_policies():
+        result = await purge(
+            policy, chunk_size or settings.RETENTION_CHUNK_SIZE, now=now, pause=pause
+        )
+        logger.info(
+            "Purged %d rows from %s in %.2fs",
+            result.deleted,
+            result.table,
+            result.seconds,
+        )
+        results.append(result)
+    return results
+
+
+class RetentionRunner:
+    """Runs ``purge_all`` every ``interval`` seconds inside the app."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await purge_all(pause=settings.RETENTION_CHUNK_PAUSE_SECONDS)
+            except Exception:
+                logger.exception("Retention run failed")
+
+
+retention_runner = RetentionRunner(settings.RETENTION_INTERVAL_SECONDS)
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.redis_client import call_redis, get_redis, request_breaker
+from app.db.session import SessionLocal
+from app.models import SessionToken
+from app.utils.cache import TTLCache
+from app.utils.shm_table import SharedExpiryTable
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "auth:revoked-sessions"
+
+
+class RevocationCache:
+    """In-memory denylist of revoked session ids.
+
+    An access token can outlive its session by at most ``ttl`` (the access
+    token lifetime), so each sid is only remembered that long; lookups are a
+    dict probe with no DB access. With Redis configured, revocations are
+    broadcast over pub/sub so every worker's copy stays current. Without it,
+    ``shm_path`` shares them between the workers on one host through a
+    ``SharedExpiryTable`` (sid -> expiry) consulted on a local miss; with
+    neither, they reach only the worker that handled them.
+    """
+
+    def __init__(
+        self, ttl: float, maxsize: int, shm_path: Optional[str] = None
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shm_path = shm_path
+        self._revoked: TTLCache[int, bool] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._shared: Optional[SharedExpiryTable] = None
+        self._listener: Optional[asyncio.Task[None]] = None
+        self._loader: Optional[asyncio.Task[None]] = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def _shared_store(self) -> Optional[SharedExpiryTable]:
+        if self._shared is None and self.shm_path:
+            self._shared = SharedExpiryTable(self.shm_path, self.maxsize)
+        return self._shared
+
+    def is_revoked(self, sid: Optional[int]) -> bool:
+        if sid is None:
+            return False
+        if self._revoked.get(sid) is not None:
+            return True
+        store = self._shared_store()
+        if store is None:
+            return False
+        # wall clock: the table is shared with other processes
+        return store.update(str(sid), time.time(), lambda exp: (None, exp is not None))
+
+    def add(self, sids: Iterable[int], ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        store = self._shared_store()
+        now = time.time()
+        for sid in sids:
+            self._revoked.set(sid, True, ttl=ttl)
+            if store is not None:
+                store.update(
+                    str(sid), now, lambda exp: (max(exp or 0.0, now + ttl), None)
+                )
+
+    async def revoke(self, sids: Iterable[int]) -> None:
+        """Deny the given sessions here and, via Redis, on every other worker."""
+        sids = list(sids)
+        if not sids:
+            return
+        self.add(sids)
+        if not settings.REDIS_URL:
+            return
+        if not request_breaker.allow():
+            logger.warning("Redis unavailable: %d revocations not broadcast", len(sids))
+            return
+        try:
+            message = ",".join(map(str, sids))
+            await call_redis(lambda r: r.publish(CHANNEL, message))
+        except Exception:
+            logger.warning("Failed to broadcast session revocation", exc_info=True)
+
+    async def load(self) -> None:
+        """Seed from sessions revoked within the last access-token lifetime."""
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            rows = await db.execute(
+                select(SessionToken.id, SessionToken.revoked_at).where(
+                    SessionToken.revoked_at >= now - timedelta(seconds=self.ttl)
+                )
+            )
+            for sid, revoked_at in rows:
+                remaining = self.ttl - (now - revoked_at).total_seconds()
+                self.add([sid], ttl=remaining)
+
+    async def warm_up(self, retry_interval: float = 5.0) -> None:
+        """``load`` at startup without making the database a boot dependency.
+
+        If it fails (database down, or not migrated yet) the worker starts
+        anyway and keeps retrying in the background.
+        """
+        try:
+            await self.load()
+        except Exception:
+            logger.warning("Revocation cache warm-up failed; retrying", exc_info=True)
+            self._loader = asyncio.create_task(self._load_until_done(retry_interval))
+
+    async def _load_until_done(self, retry_interval: float) -> None:
+        while True:
+            await asyncio.sleep(retry_interval)
+            try:
+                await self.load()
+            except Exception:
+                continue
+            logger.info("Revocation cache warmed up")
+            self._loader = None
+            return
+
+    def start(self) -> None:
+        if not settings.REDIS_URL:
+            workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+            if workers > 1 and not self.shm_path:
+                logger.warning(
+                    "Neither REDIS_URL nor REVOCATION_SHM_PATH is set: a revoked "
+                    "session's access tokens keep working on the other %d workers "
+                    "until they expire",
+                    workers - 1,
+                )
+            return
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._loader):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = self._loader = None
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(CHANNEL)
+                if reconnecting:
+                    # catch up on anything broadcast while disconnected
+                    await self.load()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.add(int(sid) for sid in message["data"].split(","))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Revocation listener disconnected", exc_info=True)
+                reconnecting = True
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+revocation_cache = RevocationCache(
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    maxsize=settings.REVOCATION_CACHE_MAX_SIZE,
+    shm_path=settings.REVOCATION_SHM_PATH,
+)
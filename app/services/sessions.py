@@ -1,26 +1,134 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Row, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import SessionToken
+from app.services.revocation import revocation_cache
+from app.utils.cursor import Cursor
 
+# the columns SessionOut needs; rows are returned as plain tuples
+SESSION_COLUMNS = (
+    SessionToken.id,
+    SessionToken.created_at,
+    SessionToken.updated_at,
+    SessionToken.revoked_at,
+    SessionToken.ip,
+    SessionToken.user_agent,
+)
 
-def list_sessions(db: Session, user_id: int) -> list[SessionToken]:
-    stmt = (
-        select(SessionToken)
-        .where(SessionToken.user_id == user_id)
-        .order_by(SessionToken.created_at.desc())
-    )
-    return list(db.scalars(stmt))
 
+async def list_sessions(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    limit: int = 50,
+    after: Optional[Cursor] = None,
+    active_only: bool = False,
+) -> Tuple[Sequence[Row], Optional[Cursor]]:
+    """One page of a user's sessions, newest first.
+
+    Pages are keyed on ``(created_at, id)`` so each one is an index range scan
+    on ``ix_sessiontoken_user_id_created_at`` however deep the client pages.
+    Returns the rows and the cursor of the next page (``None`` on the last).
+    """
+    stmt = select(*SESSION_COLUMNS).where(SessionToken.user_id == user_id)
+    if active_only:
+        stmt = stmt.where(SessionToken.revoked_at.is_(None))
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(SessionToken.created_at, SessionToken.id) < tuple_(*after)
+        )
+    stmt = stmt.order_by(SessionToken.created_at.desc(), SessionToken.id.desc())
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], (last.created_at, last.id)
 
-def revoke_session(db: Session, user_id: int, session_id: int) -> bool:
-    obj = db.get(SessionToken, session_id)
+
+async def revoke_session(db: AsyncSession, user_id: int, session_id: int) -> bool:
+    obj = await db.get(SessionToken, session_id)
     if not obj or obj.user_id != user_id:
         return False
     if obj.revoked_at is None:
         obj.revoked_at = datetime.utcnow()
         db.add(obj)
-        db.commit()
+        await db.commit()
+        await revocation_cache.revoke([session_id])
     return True
+
+
+async def _revoke_where(db: AsyncSession, *criteria: ColumnElement[bool]) -> int:
+    """Revoke every active session matching ``criteria`` in one statement.
+
+    A single ``UPDATE ... WHERE ... RETURNING`` commits the revocations,
+    then the revocation cache (and its broadcast) gets them as one batch.
+    Access tokens are only minted when a session is created, so only
+    sessions younger than the access-token lifetime can still have a live
+    one; older ids are left out of the cache. Returns the number revoked.
+    """
+    now = datetime.utcnow()
+    rows = (
+        await db.execute(
+            update(SessionToken)
+            .where(SessionToken.revoked_at.is_(None), *criteria)
+            .values(revoked_at=now)
+            .returning(SessionToken.id, SessionToken.created_at)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    await db.commit()
+    live_since = now - timedelta(seconds=revocation_cache.ttl)
+    await revocation_cache.revoke(
+        sid for sid, created_at in rows if created_at >= live_since
+    )
+    return len(rows)
+
+
+async def revoke_user_sessions(
+    db: AsyncSession, user_id: int, *, keep_session_id: Optional[int] = None
+) -> int:
+    """Log a user out everywhere, optionally except the calling session."""
+    criteria = [SessionToken.user_id == user_id]
+    if keep_session_id is not None:
+        criteria.append(SessionToken.id != keep_session_id)
+    return await _revoke_where(db, *criteria)
+
+
+async def revoke_device_sessions(
+    db: AsyncSession, user_id: int, session_id: int
+) -> Optional[int]:
+    """Revoke the user's sessions sharing ``session_id``'s device fingerprint.
+
+    Returns ``None`` if the session is not the user's.
+    """
+    fingerprint = await db.scalar(
+        select(SessionToken.device_fingerprint).where(
+            SessionToken.id == session_id, SessionToken.user_id == user_id
+        )
+    )
+    if fingerprint is None:
+        return None
+    return await _revoke_where(
+        db,
+        SessionToken.user_id == user_id,
+        SessionToken.device_fingerprint == fingerprint,
+    )
+
+
+async def revoke_sessions_created(
+    db: AsyncSession,
+    *,
+    before: datetime,
+    after: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+) -> int:
+    """Incident response: revoke sessions created in ``[after, before)``."""
+    criteria = [SessionToken.created_at < before]
+    if after is not None:
+        criteria.append(SessionToken.created_at >= after)
+    if user_id is not None:
+        criteria.append(SessionToken.user_id == user_id)
+    return await _revoke_where(db, *criteria)
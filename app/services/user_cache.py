@@ -0,0 +1,117 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import record_user_cache
+from app.core.redis_client import call_redis, request_breaker
+from app.models import User
+from app.schemas.user import UserOut
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Read-through cache of ``UserOut`` payloads keyed by user id.
+
+    A per-worker TTL LRU sits in front of an optional Redis tier shared by all
+    workers. Writers call ``invalidate`` after committing; other workers' local
+    copies age out within ``local_ttl``, so keep it short. A Redis delete that
+    fails or is skipped (breaker open) is retried on this worker's next Redis
+    call, and ``redis_ttl`` bounds how long a missed one can serve stale data.
+    """
+
+    max_missed = 10_000
+
+    def __init__(self, local_ttl: float, maxsize: int, redis_ttl: int) -> None:
+        self.redis_ttl = redis_ttl
+        self._local: TTLCache[int, Dict[str, Any]] = TTLCache(
+            maxsize=maxsize, ttl=local_ttl
+        )
+        self._missed: Set[int] = set()
+
+    def stats(self) -> Dict[str, int]:
+        """Local-tier counters; ``user_cache_lookups_total`` has every tier."""
+        return {
+            "hits": self._local.hits,
+            "misses": self._local.misses,
+            "size": len(self._local),
+        }
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Dict[str, Any]]:
+        data = self._local.get(user_id)
+        if data is not None:
+            record_user_cache("local")
+            return data
+        if settings.REDIS_URL and request_breaker.allow():
+            await self._retry_missed()
+            try:
+                raw = await call_redis(lambda r: r.get(self._key(user_id)))
+            except Exception:
+                logger.warning("User cache Redis read failed", exc_info=True)
+                raw = None
+            if raw is not None:
+                record_user_cache("redis")
+                data = json.loads(raw)
+                self._local.set(user_id, data)
+                return data
+
+        record_user_cache("miss")
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        data = UserOut.model_validate(user).model_dump()
+        self._local.set(user_id, data)
+        if settings.REDIS_URL and request_breaker.allow():
+            try:
+                await call_redis(
+                    lambda r: r.set(
+                        self._key(user_id), json.dumps(data), ex=self.redis_ttl
+                    )
+                )
+            except Exception:
+                logger.warning("User cache Redis write failed", exc_info=True)
+        return data
+
+    async def invalidate(self, user_id: int) -> None:
+        self._local.pop(user_id)
+        if not settings.REDIS_URL:
+            return
+        self._missed.add(user_id)
+        if request_breaker.allow():
+            await self._retry_missed()
+        if user_id in self._missed:
+            logger.warning(
+                "User cache Redis invalidation of user %d deferred; it may be "
+                "served stale for up to %ds",
+                user_id,
+                self.redis_ttl,
+            )
+
+    async def _retry_missed(self) -> None:
+        if not self._missed:
+            return
+        if len(self._missed) > self.max_missed:
+            self._missed.clear()  # past this, rely on redis_ttl
+            return
+        missed = list(self._missed)
+        try:
+            await call_redis(lambda r: r.delete(*map(self._key, missed)))
+        except Exception:
+            logger.warning("User cache Redis invalidation failed", exc_info=True)
+        else:
+            self._missed.difference_update(missed)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+
+user_cache = UserCache(
+    local_ttl=settings.USER_CACHE_TTL_SECONDS,
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL_SECONDS,
+)
@@ -0,0 +1,251 @@
+import asyncio
+import csv
+import json
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import _hash, pwd_context
+from app.db.session import SessionLocal
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+_email = TypeAdapter(EmailStr)
+_TRUE = {"1", "true", "yes", "y"}
+_COLUMNS = (
+    "email",
+    "password_hash",
+    "is_active",
+    "is_email_verified",
+    "created_at",
+    "updated_at",
+)
+
+# a CSV row, or one line of JSON still to be decoded by _prepare
+Record = Union[Dict[str, Any], str]
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    imported: int = 0
+    existing: int = 0
+    invalid: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.imported / max(self.seconds, 1e-9)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "read": self.read,
+            "imported": self.imported,
+            "existing": self.existing,
+            "invalid": self.invalid,
+            "seconds": round(self.seconds, 3),
+            "users_per_second": round(self.rate, 1),
+        }
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    """Yield one dict per CSV row (with a header) or one JSON line, lazily.
+
+    JSON lines are decoded by ``_prepare`` so that a malformed one is counted
+    and skipped like any other invalid record instead of ending the import.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def _prepare(raw: Record, verified: bool) -> Dict[str, Any]:
+    """Validate one input record; raises ValueError if it cannot be imported.
+
+    A ``password_hash`` must be one the password context recognises (Argon2
+    or bcrypt) and is stored as-is; otherwise ``password`` is hashed.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ValueError("malformed JSON")
+    if not isinstance(raw, dict):
+        raise ValueError("not a JSON object")
+    try:
+        email = _email.validate_python((raw.get("email") or "").strip())
+    except ValidationError:
+        raise ValueError("invalid email")
+    row: Dict[str, Any] = {
+        "email": email,
+        "is_email_verified": verified
+        or str(raw.get("is_email_verified", "")).strip().lower() in _TRUE,
+    }
+    password_hash = (raw.get("password_hash") or "").strip()
+    if password_hash:
+        if pwd_context.identify(password_hash) is None:
+            raise ValueError("unrecognised password hash")
+        row["password_hash"] = password_hash
+    elif raw.get("password"):
+        row["password"] = raw["password"]
+    else:
+        raise ValueError("no password or password_hash")
+    return row
+
+
+class _Batch:
+    """Rows whose plaintext passwords are being hashed on the pool."""
+
+    def __init__(self, rows: List[Dict[str, Any]], executor: Executor) -> None:
+        loop = asyncio.get_running_loop()
+        self.rows = rows
+        self.hashes = [
+            loop.run_in_executor(executor, _hash, row.pop("password"))
+            for row in rows
+            if "password" in row
+        ]
+
+    async def finished(self) -> List[Dict[str, Any]]:
+        hashes = iter(await asyncio.gather(*self.hashes))
+        now = datetime.utcnow()
+        for row in self.rows:
+            if "password_hash" not in row:
+                row["password_hash"] = next(hashes)
+            row.update(is_active=True, created_at=now, updated_at=now)
+        return self.rows
+
+
+async def _new_rows(
+    chunk: List[Record], stats: ImportStats, verified: bool
+) -> List[Dict[str, Any]]:
+    """Validate a chunk and drop emails that repeat within it or already exist."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for raw in chunk:
+        stats.read += 1
+        try:
+            row = _prepare(raw, verified)
+        except ValueError as e:
+            stats.invalid += 1
+            logger.warning("Skipping record %d: %s", stats.read, e)
+            continue
+        if row["email"] in rows:
+            stats.existing += 1
+            continue
+        rows[row["email"]] = row
+    if rows:
+        async with SessionLocal() as db:
+            taken = set(
+                await db.scalars(select(User.email).where(User.email.in_(list(rows))))
+            )
+        stats.existing += len(taken)
+        for email in taken:
+            del rows[email]
+    return list(rows.values())
+
+
+async def _copy(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    columns = ", ".join(_COLUMNS)
+    async with raw.driver_connection.cursor() as cursor:
+        async with cursor.copy(
+            f'COPY "{User.__tablename__}" ({columns}) FROM STDIN'
+        ) as copy:
+            for row in rows:
+                await copy.write_row([row[c] for c in _COLUMNS])
+    return len(rows)
+
+
+async def _insert_ignoring_duplicates(
+    db: AsyncSession, rows: List[Dict[str, Any]]
+) -> int:
+    dialect_insert = (
+        pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    )
+    ids = await db.scalars(
+        dialect_insert(User)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id),
+        rows,
+    )
+    return len(list(ids))
+
+
+async def _load(rows: List[Dict[str, Any]]) -> int:
+    """Insert a batch in one transaction; returns the number of new users.
+
+    Postgres gets a single COPY. If an email was registered since the
+    existence check (or repeats across batches), the COPY fails as a whole
+    and the batch is retried as an INSERT ... ON CONFLICT DO NOTHING.
+    """
+    async with SessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            from psycopg.errors import UniqueViolation
+
+            try:
+                inserted = await _copy(db, rows)
+                await db.commit()
+                return inserted
+            except UniqueViolation:
+                await db.rollback()
+        inserted = await _insert_ignoring_duplicates(db, rows)
+        await db.commit()
+        return inserted
+
+
+async def import_users(
+    records: Iterable[Record],
+    executor: Executor,
+    batch_size: int = 1000,
+    verified: bool = False,
+    progress: Optional[Callable[[ImportStats], None]] = None,
+) -> ImportStats:
+    """Stream ``records`` into the user table in batches of ``batch_size``.
+
+    At most two batches are held at once: the next batch's passwords hash on
+    ``executor`` while the current one is written, so memory stays flat
+    however large the input is.
+    """
+    stats = ImportStats()
+    records = iter(records)
+    pending: Optional[_Batch] = None
+    while True:
+        chunk = list(islice(records, batch_size))
+        batch = _Batch(await _new_rows(chunk, stats, verified), executor)
+        if pending is not None:
+            written = await _load(await pending.finished()) if pending.rows else 0
+            stats.existing += len(pending.rows) - written
+            stats.imported += written
+            if progress is not None and pending.rows:
+                progress(stats)
+        if not chunk:
+            return stats
+        pending = batch
@@ -0,0 +1,121 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Callable, Optional, Tuple, TypeVar
+
+R = TypeVar("R")
+
+_HEADER = struct.Struct("<8sQ")  # magic, number of buckets
+_SLOT = struct.Struct("<Qd")  # key hash (0 = never used), expiry
+_MAGIC = b"SHMTAT01"
+BUCKET_SLOTS = 16
+_BUCKET_BYTES = BUCKET_SLOTS * _SLOT.size
+
+
+def _key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class SharedExpiryTable:
+    """Fixed-size ``key -> expiry`` table in a memory-mapped file.
+
+    Every process that maps the same ``path`` (e.g. under ``/dev/shm``) sees
+    the same entries. Keys are stored as 64-bit hashes and land in a bucket of
+    ``BUCKET_SLOTS`` slots probed linearly; a slot whose expiry has passed is
+    free for reuse, so nothing needs sweeping. A bucket full of live entries
+    evicts the one expiring soonest. Each update locks only its bucket's byte
+    range (fcntl record locks, striped per bucket) plus a thread lock, since
+    record locks do not exclude threads of the same process.
+
+    Expiries are wall-clock seconds: unlike ``time.monotonic`` they stay
+    meaningful across reboots if the file outlives one.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        buckets = max(1, math.ceil(capacity / BUCKET_SLOTS))
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                buckets = self._init_file(fd, buckets)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            self._mm = mmap.mmap(fd, _HEADER.size + buckets * _BUCKET_BYTES)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self.buckets = buckets
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _init_file(fd: int, buckets: int) -> int:
+        if os.fstat(fd).st_size >= _HEADER.size:
+            magic, existing = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+            if magic == _MAGIC:
+                # other processes may have it mapped: adopt, never resize
+                return existing
+        os.ftruncate(fd, _HEADER.size + buckets * _BUCKET_BYTES)
+        os.pwrite(fd, _HEADER.pack(_MAGIC, buckets), 0)
+        return buckets
+
+    def update(
+        self,
+        key: str,
+        now: float,
+        fn: Callable[[Optional[float]], Tuple[Optional[float], R]],
+    ) -> R:
+        """Atomically read-modify-write the expiry of ``key``.
+
+        ``fn`` gets the live expiry (``None`` if absent or expired) and
+        returns ``(new_expiry or None to leave it, result)``.
+        """
+        h = _key_hash(key)
+        base = _HEADER.size + (h % self.buckets) * _BUCKET_BYTES
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, _BUCKET_BYTES, base)
+            try:
+                found = free = None
+                victim, victim_expiry = base, math.inf
+                for offset in range(base, base + _BUCKET_BYTES, _SLOT.size):
+                    slot_key, expiry = _SLOT.unpack_from(self._mm, offset)
+                    if slot_key == h:
+                        found = offset
+                        break
+                    if slot_key == 0 or expiry <= now:
+                        if free is None:
+                            free = offset
+                        if slot_key == 0:
+                            break  # slots are filled in order: none used beyond
+                    elif expiry < victim_expiry:
+                        victim, victim_expiry = offset, expiry
+
+                current = None
+                if found is not None:
+                    _, expiry = _SLOT.unpack_from(self._mm, found)
+                    current = expiry if expiry > now else None
+                new_expiry, result = fn(current)
+                if new_expiry is not None:
+                    offset = next(o for o in (found, free, victim) if o is not None)
+                    _SLOT.pack_into(self._mm, offset, h, new_expiry)
+                return result
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, _BUCKET_BYTES, base)
+
+    def clear(self) -> None:
+        size = self.buckets * _BUCKET_BYTES
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, size, _HEADER.size)
+            try:
+                self._mm[_HEADER.size :] = bytes(size)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, size, _HEADER.size)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
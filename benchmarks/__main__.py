@@ -0,0 +1,234 @@
+"""Load-test the API: ``python -m benchmarks [options]``.
+
+Seeds users with Faker, logs each virtual user in, then drives every selected
+endpoint for a fixed duration and prints per-endpoint RPS and latency
+percentiles as JSON. With ``--baseline`` the run is compared against stored
+results and exits non-zero on regressions.
+
+Targets:
+  asgi      in-process through httpx's ASGI transport (default; no network)
+  uvicorn   a local uvicorn subprocess on --port, with --workers workers
+  --url     an already running server that shares the --db database
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.harness import compare, drive
+
+PASSWORD = "bench-password"
+
+ENDPOINTS = {
+    "login": lambda c: c.post("/auth/login", json=c.credentials),
+    "refresh": lambda c: c.post("/auth/refresh"),
+    "me": lambda c: c.get("/users/me"),
+    "sessions": lambda c: c.get("/sessions/", params={"limit": 20}),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--db",
+        default="sqlite",
+        help="'sqlite' for a throwaway file database, or a database URL",
+    )
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--users", type=int, default=50, help="users to seed")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="virtual users; keep logins within PASSWORD_HASH_WORKERS + QUEUE_SIZE",
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument(
+        "--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset"
+    )
+    parser.add_argument("--out", help="write results JSON here as well")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="allowed fractional change before flagging a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def configure_env(args: argparse.Namespace) -> Dict[str, str]:
+    """Settings for the app under test; must run before ``app`` is imported."""
+    if args.db == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    else:
+        os.environ["DATABASE_URL"] = args.db
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    # measure the endpoints, not the brute-force limits
+    for name in ("RATE_LIMIT_LOGIN", "RATE_LIMIT_REGISTER", "RATE_LIMIT_EMAIL"):
+        os.environ.setdefault(name, "1000000000/1")
+    return dict(os.environ)
+
+
+async def seed(n: int) -> List[str]:
+    from faker import Faker
+    from sqlalchemy import insert
+
+    from app.core.security import get_password_hash_async
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.models import User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    fake = Faker()
+    Faker.seed(1234)
+    run = uuid.uuid4().hex[:8]  # keeps emails unique across runs on one database
+    emails = [
+        f"{fake.user_name()}.{run}{i}@{fake.free_email_domain()}" for i in range(n)
+    ]
+    # one hash for everyone: seeding should not take minutes
+    password_hash = await get_password_hash_async(PASSWORD)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {"email": e, "password_hash": password_hash, "is_email_verified": True}
+                for e in emails
+            ],
+        )
+    await engine.dispose()
+    return emails
+
+
+@asynccontextmanager
+async def transport(args: argparse.Namespace, env: Dict[str, str]) -> AsyncIterator:
+    """Yields ``(transport, base_url)`` for the selected target."""
+    if args.url:
+        yield None, args.url
+    elif args.target == "asgi":
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            yield httpx.ASGITransport(app=app), "http://bench"
+    else:
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--port",
+                str(args.port),
+                "--workers",
+                str(args.workers),
+                "--log-level",
+                "warning",
+            ],
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            await _wait_healthy(base_url)
+            yield None, base_url
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+async def _wait_healthy(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).is_success:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become healthy")
+
+
+async def run(args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Any]:
+    emails = await seed(max(args.users, args.concurrency))
+    selected = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    results: Dict[str, Any] = {
+        "meta": {
+            "target": args.url or args.target,
+            "db": env["DATABASE_URL"].split("://")[0],
+            "workers": args.workers,
+            "users": len(emails),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "python": platform.python_version(),
+        },
+        "endpoints": {},
+    }
+    async with transport(args, env) as (tr, base_url):
+        clients = []
+        for i in range(args.concurrency):
+            client = httpx.AsyncClient(transport=tr, base_url=base_url, timeout=30)
+            client.credentials = {"email": emails[i], "password": PASSWORD}
+            resp = await client.post("/auth/login", json=client.credentials)
+            resp.raise_for_status()
+            clients.append(client)
+        try:
+            for name in selected:
+                stats = await drive(
+                    clients, ENDPOINTS[name], args.duration, args.warmup
+                )
+                results["endpoints"][name] = stats.summary()
+                print(f"{name}: {results['endpoints'][name]}", file=sys.stderr)
+        finally:
+            for client in clients:
+                await client.aclose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    env = configure_env(args)
+    results = asyncio.run(run(args, env))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("target", "db", "workers", "concurrency"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(
+                    f"WARNING baseline {key} differs; compare with care",
+                    file=sys.stderr,
+                )
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Closed-loop load generator and result comparison.
+
+Independent of the app: callers provide an ``httpx.AsyncClient`` per virtual
+user, already authenticated, and a request function per endpoint.
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import httpx
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+        ms = [v * 1000 for v in lat]
+        return {
+            "requests": len(lat),
+            "errors": self.errors,
+            "rps": round(len(lat) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+        }
+
+
+async def drive(
+    clients: Sequence[httpx.AsyncClient],
+    request: Request,
+    duration: float,
+    warmup: float = 0.0,
+) -> EndpointStats:
+    """Each client issues ``request`` back to back for ``warmup + duration``s.
+
+    Only requests started after the warm-up are recorded. Non-2xx responses
+    and transport errors count as errors, not latencies.
+    """
+    stats = EndpointStats()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def user(client: httpx.AsyncClient) -> None:
+        while (t0 := time.perf_counter()) < stop_at:
+            try:
+                resp = await request(client)
+                ok = resp.is_success
+            except httpx.HTTPError:
+                ok = False
+            if t0 < measure_from:
+                continue
+            if ok:
+                stats.latencies.append(time.perf_counter() - t0)
+            else:
+                stats.errors += 1
+
+    await asyncio.gather(*(user(c) for c in clients))
+    stats.elapsed = time.perf_counter() - measure_from
+    return stats
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond ``threshold``.
+
+    Flags a drop in RPS or a rise in p95/p99 latency by more than the given
+    fraction (0.1 = 10%), and any new errors.
+    """
+    regressions = []
+    for name, cur in results["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+        if base["rps"] and cur["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']} -> {cur['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and cur[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {base[key]} -> {cur[key]}")
+        if cur["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {cur['errors']}")
+    return regressions
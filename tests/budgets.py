@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Upper bounds for one request: statements, commits and (opt-in) latency."""
+
+    statements: int
+    commits: int = 0
+    max_ms: Optional[float] = None
+
+
+# Every route under app/api/routes declares its worst-case budget here, and
+# the client fixture in conftest.py enforces it (audit writes are synchronous
+# in tests, so they count). Raising one is a deliberate, reviewed change;
+# test_every_route_has_a_budget keeps the table complete.
+# Latency limits are loose (cold first requests included) and only checked
+# with --latency-budgets.
+QUERY_BUDGETS = {
+    "POST /auth/register": Budget(5, 1, max_ms=250),
+    "POST /auth/login": Budget(3, 1, max_ms=250),
+    "POST /auth/logout": Budget(3, 2, max_ms=100),
+    "POST /auth/refresh": Budget(3, 1, max_ms=100),
+    "POST /auth/resend-verification": Budget(4, 1, max_ms=100),
+    "GET /auth/verify-email": Budget(5, 1, max_ms=100),
+    "POST /auth/request-password-reset": Budget(3, 1, max_ms=100),
+    "POST /auth/reset-password": Budget(4, 1, max_ms=250),
+    "GET /users/me": Budget(1, max_ms=50),
+    "GET /sessions/": Budget(1, max_ms=50),
+    "POST /sessions/{session_id}/revoke": Budget(2, 1, max_ms=50),
+    "POST /sessions/revoke-all": Budget(2, 1, max_ms=50),
+    "POST /sessions/{session_id}/revoke-device": Budget(3, 1, max_ms=50),
+    "POST /admin/sessions/revoke": Budget(3, 1, max_ms=50),
+    "GET /admin/audit/": Budget(2, max_ms=250),
+    "GET /admin/audit/export": Budget(2, max_ms=250),
+    "GET /health": Budget(0, max_ms=25),
+    "GET /.well-known/jwks.json": Budget(0, max_ms=25),
+    "GET /metrics": Budget(0, max_ms=100),
+}
@@ -0,0 +1,202 @@
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+import asyncio  # noqa: E402
+import re  # noqa: E402
+import time  # noqa: E402
+from collections import Counter  # noqa: E402
+from typing import Optional  # noqa: E402
+
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from budgets import QUERY_BUDGETS  # noqa: E402
+from httpx import ASGITransport, AsyncClient, Response  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from starlette.routing import Match  # noqa: E402
+
+from app.core import rate_limit, security  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import *  # noqa: F401,F403,E402
+from app.services.refresh import refresh_coalescer  # noqa: E402
+from app.services.revocation import revocation_cache  # noqa: E402
+from app.services.user_cache import user_cache  # noqa: E402
+
+# The suite exercises hashing, not its cost: use the cheapest Argon2 parameters.
+security.pwd_context.update(
+    argon2__time_cost=1, argon2__memory_cost=8, argon2__parallelism=1
+)
+
+
+# same statement this many times in one request looks like an N+1 loop
+N_PLUS_ONE_THRESHOLD = 3
+
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|SAVEPOINT|RELEASE|ROLLBACK)", re.I)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--latency-budgets",
+        action="store_true",
+        help="also fail requests slower than their Budget.max_ms",
+    )
+
+
+# pysqlite defers BEGIN and breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+# so sessions can nest inside the per-test transaction below.
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_manual_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _sqlite_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+_schema_created = False
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # the in-memory database's connection (and its aiosqlite thread) outlives
+    # the per-test event loops; close it or the interpreter never exits
+    asyncio.run(engine.dispose())
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """Run the test inside one transaction that is rolled back at teardown.
+
+    The in-memory schema is created once per run. ``SessionLocal`` sessions
+    join the outer transaction through SAVEPOINTs, so their commits behave
+    normally for the code under test and disappear afterwards.
+    """
+    global _schema_created
+    async with engine.connect() as conn:
+        if not _schema_created:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.commit()
+            _schema_created = True
+        outer = await conn.begin()
+        SessionLocal.configure(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield engine
+        finally:
+            SessionLocal.configure(
+                bind=engine, join_transaction_mode="conservative_savepoint"
+            )
+            await outer.rollback()
+
+
+class QueryCounter:
+    """Statements and commits issued on the engine while the fixture is active.
+
+    Transaction control (BEGIN / SAVEPOINT ...) is not counted; a session
+    commit counts whether it ends a transaction or releases a savepoint.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.commits = 0
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not _TRANSACTION_CONTROL.match(statement):
+            self.statements.append(statement)
+
+    def on_commit(self, conn, *args) -> None:
+        self.commits += 1
+
+    def install(self) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self.on_execute)
+        event.listen(sync_engine, "commit", self.on_commit)
+        event.listen(sync_engine, "release_savepoint", self.on_commit)
+
+    def remove(self) -> None:
+        sync_engine = engine.sync_engine
+        event.remove(sync_engine, "before_cursor_execute", self.on_execute)
+        event.remove(sync_engine, "commit", self.on_commit)
+        event.remove(sync_engine, "release_savepoint", self.on_commit)
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    counter = QueryCounter()
+    counter.install()
+    yield counter
+    counter.remove()
+
+
+def route_key(method: str, path: str) -> Optional[str]:
+    scope = {"type": "http", "method": method, "path": path}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{method} {route.path}"
+    return None
+
+
+class RequestBudgets:
+    """Checks every request made through ``client`` against QUERY_BUDGETS."""
+
+    def __init__(self, check_latency: bool) -> None:
+        self.check_latency = check_latency
+        self.counter = QueryCounter()
+        self._started = 0.0
+
+    async def on_request(self, request) -> None:
+        self.counter.reset()
+        self._started = time.perf_counter()
+
+    async def on_response(self, response: Response) -> None:
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        key = route_key(response.request.method, response.request.url.path)
+        budget = QUERY_BUDGETS.get(key) if key else None
+        if budget is None:
+            return
+        statements = self.counter.statements
+        assert len(statements) <= budget.statements, (
+            f"{key} issued {len(statements)} statements, budget "
+            f"{budget.statements}:\n" + "\n".join(statements)
+        )
+        assert (
+            self.counter.commits <= budget.commits
+        ), f"{key} committed {self.counter.commits} times, budget {budget.commits}"
+        repeated = [
+            s for s, n in Counter(statements).items() if n >= N_PLUS_ONE_THRESHOLD
+        ]
+        assert not repeated, f"{key} repeats a statement (N+1?):\n{repeated[0]}"
+        if self.check_latency and budget.max_ms is not None:
+            assert (
+                elapsed_ms <= budget.max_ms
+            ), f"{key} took {elapsed_ms:.1f}ms, budget {budget.max_ms}ms"
+
+
+@pytest_asyncio.fixture
+async def client(db_engine, request):
+    rate_limit._memory_store.clear()
+    refresh_coalescer._recent.clear()
+    revocation_cache._revoked.clear()
+    user_cache._local.clear()
+    budgets = RequestBudgets(request.config.getoption("--latency-budgets"))
+    budgets.counter.install()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport,
+        base_url="http://test",
+        event_hooks={
+            "request": [budgets.on_request],
+            "response": [budgets.on_response],
+        },
+    ) as ac:
+        yield ac
+    budgets.counter.remove()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select, update
+
+from app.db.session import SessionLocal
+from app.models import AuditLog, Role, User
+from app.services import audit
+from app.services.audit import AuditBuffer, log_action
+from app.services.audit_partitions import add_months, partition_bounds, partition_name
+
+
+def _entry(action: str) -> dict:
+    return {"user_id": None, "action": action, "ip": "127.0.0.1", "user_agent": "t"}
+
+
+async def _count() -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(AuditLog))
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_batch_size_and_drains_on_stop(db_engine):
+    buffer = AuditBuffer(max_size=100, batch_size=2, flush_interval=60)
+    buffer.start()
+    for i in range(3):
+        await buffer.put(_entry(f"a{i}"))
+    # a full batch flushes without waiting for the interval
+    for _ in range(100):
+        if buffer.flushed >= 2:
+            break
+        await asyncio.sleep(0.01)
+    assert await _count() == 2
+
+    await buffer.stop()
+    assert await _count() == 3
+    assert buffer.flushed == 3 and buffer.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_interval(db_engine):
+    buffer = AuditBuffer(max_size=100, batch_size=100, flush_interval=0.05)
+    buffer.start()
+    await buffer.put(_entry("login"))
+    await asyncio.sleep(0.2)
+    assert await _count() == 1
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_only_rejected_entries(db_engine):
+    buffer = AuditBuffer(max_size=100, batch_size=100, flush_interval=60)
+    await buffer._flush([_entry("a"), {**_entry("b"), "ip": None}, _entry("c")])
+    assert buffer.flushed == 2 and buffer.dropped == 1
+    assert await _count() == 2
+
+
+@pytest.mark.asyncio
+async def test_buffer_retries_transient_failures(db_engine, monkeypatch):
+    buffer = AuditBuffer(max_size=100, batch_size=100, flush_interval=60)
+    buffer.retry_delay = 0
+    insert_batch = buffer._insert
+    failures = iter([ConnectionError("reset")])
+
+    async def flaky(batch):
+        for error in failures:
+            raise error
+        await insert_batch(batch)
+
+    monkeypatch.setattr(buffer, "_insert", flaky)
+    await buffer._flush([_entry("a"), _entry("b")])
+    assert buffer.flushed == 2 and buffer.dropped == 0
+    assert await _count() == 2
+
+
+@pytest.mark.asyncio
+async def test_buffered_entries_are_queued_only_after_commit(db_engine, monkeypatch):
+    buffer = AuditBuffer(max_size=100, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(audit, "audit_buffer", buffer)
+    monkeypatch.setattr(audit.settings, "AUDIT_MODE", "buffered")
+    buffer.start()
+    try:
+        async with SessionLocal() as db:
+            await log_action(db, user_id=None, action="login", ip="i", user_agent="u")
+            await db.rollback()  # e.g. the login failed after logging
+            await db.commit()
+            assert buffer.pending == 0
+
+            await log_action(db, user_id=None, action="login", ip="i", user_agent="u")
+            async with db.begin_nested():
+                pass
+            await (await db.begin_nested()).rollback()
+            assert buffer.pending == 0  # SAVEPOINTs neither queue nor discard
+            await db.commit()
+            assert buffer.pending == 1
+    finally:
+        await buffer.stop()
+    assert buffer.flushed == 1 and await _count() == 1
+
+
+async def _admin_client(client) -> None:
+    body = {"email": "root@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    async with SessionLocal() as db:
+        role = Role(name="admin")
+        db.add(role)
+        await db.flush()
+        await db.execute(
+            update(User).where(User.email == body["email"]).values(role_id=role.id)
+        )
+        base = datetime(2026, 1, 1)
+        await db.execute(
+            insert(AuditLog),
+            [
+                {
+                    **_entry("login" if i % 2 else "refresh"),
+                    "created_at": base + timedelta(hours=i),
+                }
+                for i in range(10)
+            ],
+        )
+        await db.commit()
+    await client.post("/auth/login", json=body)
+
+
+@pytest.mark.asyncio
+async def test_audit_query_requires_admin(client):
+    assert (await client.get("/admin/audit/")).status_code == 401
+    body = {"email": "plain@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    assert (await client.get("/admin/audit/")).status_code == 403
+    assert (await client.get("/admin/audit/export")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_audit_query_filters_and_pages(client):
+    await _admin_client(client)
+    params = {"action": "login", "until": "2026-01-02T00:00:00", "limit": 2}
+    seen = []
+    while True:
+        page = (await client.get("/admin/audit/", params=params)).json()
+        seen += page["items"]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert [row["action"] for row in seen] == ["login"] * 5
+    times = [row["created_at"] for row in seen]
+    assert times == sorted(times, reverse=True)
+
+    page = (
+        await client.get("/admin/audit/", params={"since": "2026-01-01T08:00:00"})
+    ).json()
+    # two seeded rows plus the admin's own register/login today
+    assert len(page["items"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_audit_export_streams_ndjson(client):
+    await _admin_client(client)
+    resp = await client.get(
+        "/admin/audit/export",
+        params={"action": "refresh", "until": "2026-01-02T00:00:00"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rows) == 5 and {r["action"] for r in rows} == {"refresh"}
+
+
+def test_partition_bounds():
+    assert partition_name(datetime(2026, 12, 15)) == "auditlog_p202612"
+    assert add_months(datetime(2026, 12, 1), 1) == datetime(2027, 1, 1)
+    assert partition_bounds("auditlog_p202612") == (
+        datetime(2026, 12, 1),
+        datetime(2027, 1, 1),
+    )
+    assert partition_bounds("auditlog_default") is None
@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models import EmailToken
+from app.services import auth as auth_svc
+
+
+@pytest.mark.asyncio
+async def test_register_login_refresh_logout(client):
+    resp = await client.post(
+        "/auth/register", json={"email": "alice@example.com", "password": "pw123456"}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["email"] == "alice@example.com"
+
+    resp = await client.post(
+        "/auth/login", json={"email": "alice@example.com", "password": "pw123456"}
+    )
+    assert resp.status_code == 200
+    assert "access_token" in client.cookies
+
+    resp = await client.get("/users/me")
+    assert resp.status_code == 200
+    assert resp.json()["email"] == "alice@example.com"
+
+    resp = await client.post("/auth/refresh")
+    assert resp.status_code == 200
+
+    resp = await client.get("/sessions/")
+    assert resp.status_code == 200
+    sessions = resp.json()["items"]
+    assert len(sessions) == 2
+    assert sum(s["revoked_at"] is None for s in sessions) == 1
+
+    resp = await client.post("/auth/logout")
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_login_rejects_bad_password(client):
+    await client.post(
+        "/auth/register", json={"email": "bob@example.com", "password": "right"}
+    )
+    resp = await client.post(
+        "/auth/login", json={"email": "bob@example.com", "password": "wrong"}
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_login_and_register_use_one_transaction(client, query_counter):
+    body = {"email": "carol@example.com", "password": "pw"}
+    assert (await client.post("/auth/register", json=body)).status_code == 200
+    # SELECT existing email, INSERT user RETURNING, INSERT email token,
+    # INSERT outbox, INSERT audit
+    assert len(query_counter.statements) == 5
+    assert query_counter.commits == 1
+
+    query_counter.reset()
+    assert (await client.post("/auth/login", json=body)).status_code == 200
+    # SELECT user, INSERT session RETURNING, INSERT audit
+    assert len(query_counter.statements) == 3
+    assert "RETURNING" in query_counter.statements[1]
+    assert query_counter.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_register_duplicate_email(client, monkeypatch):
+    body = {"email": "dave@example.com", "password": "pw"}
+    assert (await client.post("/auth/register", json=body)).status_code == 200
+
+    async def must_not_hash(password):
+        raise AssertionError("duplicate registration hashed a password")
+
+    monkeypatch.setattr(auth_svc, "get_password_hash_async", must_not_hash)
+    resp = await client.post("/auth/register", json=body)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Email already registered"
+
+
+@pytest.mark.asyncio
+async def test_revoked_session_access_token_is_rejected_immediately(client):
+    body = {"email": "erin@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    access = client.cookies["access_token"]
+    assert (await client.get("/users/me")).status_code == 200
+
+    sid = (await client.get("/sessions/")).json()["items"][0]["id"]
+    assert (await client.post(f"/sessions/{sid}/revoke")).status_code == 200
+
+    client.cookies.set("access_token", access)
+    assert (await client.get("/users/me")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_session(client):
+    body = {"email": "fay@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    access = client.cookies["access_token"]
+
+    assert (await client.post("/auth/logout")).status_code == 200
+    client.cookies.set("access_token", access)
+    assert (await client.get("/users/me")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_me_is_served_from_cache_and_invalidated_on_verify(client, query_counter):
+    body = {"email": "gus@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    assert (await client.get("/users/me")).json()["is_email_verified"] is False
+
+    query_counter.reset()
+    assert (await client.get("/users/me")).status_code == 200
+    assert query_counter.statements == []
+
+    async with SessionLocal() as db:
+        token = await db.scalar(
+            select(EmailToken.token).where(EmailToken.purpose == "verify_email")
+        )
+    assert (
+        await client.get("/auth/verify-email", params={"token": token})
+    ).status_code == 200
+    assert (await client.get("/users/me")).json()["is_email_verified"] is True
@@ -0,0 +1,31 @@
+from benchmarks.harness import EndpointStats, compare, percentile
+
+
+def _result(rps: float, p95: float, errors: int = 0) -> dict:
+    return {
+        "endpoints": {
+            "me": {"rps": rps, "p95_ms": p95, "p99_ms": p95, "errors": errors}
+        }
+    }
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 95) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summary():
+    stats = EndpointStats(latencies=[0.001 * i for i in range(1, 11)], elapsed=2.0)
+    summary = stats.summary()
+    assert summary["requests"] == 10 and summary["rps"] == 5.0
+    assert summary["p50_ms"] == 5.0 and summary["p99_ms"] == 10.0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _result(rps=1000, p95=10)
+    assert compare(_result(rps=950, p95=10.5), baseline, 0.1) == []
+    regressions = compare(_result(rps=800, p95=15, errors=2), baseline, 0.1)
+    assert len(regressions) == 4  # rps, p95, p99, errors
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.routing import ReplicaSet, RoutingSession
+from app.models import User
+
+
+async def _database(path, email):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User).values(email=email, password_hash="h"))
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_routing_session_reads_replica_until_first_write(tmp_path):
+    # distinct rows tell the two databases apart
+    primary = await _database(tmp_path / "primary.db", "primary@example.com")
+    replica = await _database(tmp_path / "replica.db", "replica@example.com")
+    Session = async_sessionmaker(primary, sync_session_class=RoutingSession)
+    emails = select(User.email).order_by(User.email)
+    try:
+        async with Session(info={"replica": replica}) as db:
+            assert list(await db.scalars(emails)) == ["replica@example.com"]
+            db.add(User(email="new@example.com", password_hash="h"))
+            await db.flush()
+            # pinned to the primary from the first write on
+            assert list(await db.scalars(emails)) == [
+                "new@example.com",
+                "primary@example.com",
+            ]
+            await db.commit()
+            assert list(await db.scalars(emails))[0] == "new@example.com"
+        async with Session() as db:
+            assert "primary@example.com" in list(await db.scalars(emails))
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_set_rotates_over_healthy_replicas(tmp_path):
+    good = [await _database(tmp_path / f"r{i}.db", "x@example.com") for i in range(2)]
+    bad = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'r.db'}")
+    replicas = ReplicaSet([good[0], bad, good[1]], interval=60)
+
+    await replicas.check()
+    assert replicas.healthy == good
+    assert [replicas.choose() for _ in range(4)] == good * 2
+    assert len(replicas.stats()["healthy"]) == 2
+
+    await good[0].dispose()
+    replicas.engines = [bad]
+    await replicas.check()
+    assert replicas.choose() is None
+    await replicas.stop()
+    await good[1].dispose()
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.metrics import render
+from app.db.session import SessionLocal
+from app.models import EmailOutbox
+from app.services.email import EmailService, OutboxWorker, SMTPTransport
+
+
+class StandInSMTPServer:
+    """Just enough SMTP for smtplib.send_message; records what it receives."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.messages: list[str] = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+
+        def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 stand-in ESMTP")
+        while line := await reader.readline():
+            cmd = line.decode().strip().upper()
+            if cmd.startswith("EHLO"):
+                reply("250-stand-in")
+                reply("250 8BITMIME")
+            elif cmd == "DATA":
+                reply("354 end with <CRLF>.<CRLF>")
+                data = []
+                while (chunk := await reader.readline()) != b".\r\n":
+                    data.append(chunk.decode())
+                self.messages.append("".join(data))
+                reply("250 queued")
+            elif cmd == "QUIT":
+                reply("221 bye")
+                break
+            else:
+                reply("250 ok")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+
+def _worker(**kwargs) -> OutboxWorker:
+    opts = dict(workers=1, batch_size=10, poll_interval=1, max_attempts=3, retry_base=1)
+    opts.update(kwargs)
+    return OutboxWorker(**opts)
+
+
+async def _queue(n: int) -> None:
+    async with SessionLocal() as db:
+        for i in range(n):
+            EmailService().send_verification(db, f"user{i}@example.com", f"tok{i}")
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_batch_delivered_over_one_smtp_connection(db_engine, monkeypatch):
+    smtp = StandInSMTPServer()
+    server = await asyncio.start_server(smtp.handle, "127.0.0.1", 0)
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", server.sockets[0].getsockname()[1])
+
+    await _queue(3)
+    worker = _worker()
+    transport = SMTPTransport()
+    try:
+        assert await worker.process_batch(transport) == 3
+    finally:
+        await asyncio.to_thread(transport.close)
+        server.close()
+
+    assert smtp.connections == 1
+    assert len(smtp.messages) == 3 and "tok0" in smtp.messages[0]
+    stats = await worker.stats()
+    assert stats["depth"] == 0 and stats["sent"] == 3
+
+
+class BrokenTransport:
+    def send(self, msg):
+        raise ConnectionRefusedError("provider down")
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_backs_off_then_gives_up(db_engine):
+    await _queue(1)
+    worker = _worker(max_attempts=2)
+
+    assert await worker.process_batch(BrokenTransport()) == 1
+    async with SessionLocal() as db:
+        msg = await db.scalar(select(EmailOutbox))
+    assert msg.status == "pending" and msg.attempts == 1
+    assert "provider down" in msg.last_error
+    # not due again until the backoff elapses
+    assert await worker.process_batch(BrokenTransport()) == 0
+
+    async with SessionLocal() as db:
+        await db.execute(update(EmailOutbox).values(next_attempt_at=msg.created_at))
+        await db.commit()
+    assert await worker.process_batch(BrokenTransport()) == 1
+    async with SessionLocal() as db:
+        msg = await db.scalar(select(EmailOutbox))
+    assert msg.status == "failed" and msg.attempts == 2
+    assert (await worker.stats())["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_exported_and_lease_covers_slow_batches(db_engine):
+    await _queue(2)
+    worker = _worker(batch_size=50, send_timeout=10)
+    await worker.stats()
+    text = render()[0].decode()
+    assert "email_outbox_depth 2.0" in text
+    assert worker.last_stats["depth"] == 2
+    # 50 messages that each time out on send, reconnect and resend
+    assert worker.lease.total_seconds() > 50 * 3 * 10
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from passlib.hash import argon2
+from sqlalchemy import select
+
+from app.cli.calibrate import calibrate
+from app.core.hashing import HashingExecutor, HashingOverloaded
+from app.core.security import _hash, _verify, password_needs_rehash
+from app.db.session import SessionLocal
+from app.models import User
+from app.services import auth as auth_svc
+
+
+def test_process_pool_hash_roundtrip():
+    executor = HashingExecutor(max_workers=1, max_queue=1)
+    try:
+        hashed = executor.run(_hash, "s3cret")
+        assert executor.run(_verify, "s3cret", hashed)
+        assert not executor.run(_verify, "wrong", hashed)
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_when_queue_full():
+    executor = HashingExecutor(max_workers=1, max_queue=0)
+    try:
+        fut = executor.submit(time.sleep, 0.5)
+        with pytest.raises(HashingOverloaded):
+            executor.submit(time.sleep, 0)
+        fut.result()
+        # the slot is released by a done-callback that may still be running
+        deadline = time.monotonic() + 5
+        while executor.in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert executor.in_flight == 0
+        executor.run(time.sleep, 0)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_zero_workers_hash_off_the_event_loop():
+    executor = HashingExecutor(max_workers=0, max_queue=1)
+    try:
+        thread = await executor.run_async(threading.get_ident)
+        assert thread != threading.get_ident()
+        assert executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+def test_calibrate_prefers_memory_then_passes():
+    # nothing fits a zero budget: memory bottoms out, one pass
+    params = calibrate(0, max_memory_kib=64, samples=1)
+    assert (params.time_cost, params.memory_cost) == (1, 8)
+    # everything fits a generous one: full memory, passes up to the cap
+    params = calibrate(10_000, max_memory_kib=64, max_time_cost=2, samples=1)
+    assert (params.time_cost, params.memory_cost) == (2, 64)
+    assert params.env()["ARGON2_MEMORY_COST"] == "64"
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_legacy_hash(db_engine):
+    legacy = argon2.using(time_cost=2, memory_cost=16, parallelism=1).hash("s3cret")
+    assert password_needs_rehash(legacy)
+    async with SessionLocal() as db:
+        user = User(email="legacy@example.com", password_hash=legacy)
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    async with SessionLocal() as db:
+        await auth_svc.login(db, "legacy@example.com", "s3cret", "1.2.3.4", "ua")
+    await auth_svc.wait_for_rehashes()
+
+    async with SessionLocal() as db:
+        upgraded = await db.scalar(select(User.password_hash).where(User.id == user_id))
+    assert upgraded != legacy
+    assert not password_needs_rehash(upgraded)
+    assert _verify("s3cret", upgraded)
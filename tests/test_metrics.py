@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+
+def _value(text: str, sample: str) -> float:
+    m = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.M)
+    return float(m.group(1)) if m else 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_route_db_hash_and_limiter_series(client):
+    before = (await client.get("/metrics")).text
+    body = {"email": "metrics@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    await client.get("/sessions/42/revoke")  # 405: still labelled by template
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    text = resp.text
+
+    for sample, delta in [
+        ('http_requests_total{method="POST",route="/auth/login",status="200"}', 1),
+        (
+            'http_requests_total{method="GET",route="/sessions/{session_id}/revoke",'
+            'status="405"}',
+            1,
+        ),
+        ('password_hash_duration_seconds_count{op="hash"}', 1),
+        ('password_hash_duration_seconds_count{op="verify"}', 1),
+        (
+            'rate_limit_decisions_total{backend="local",decision="allowed",'
+            'policy="login"}',
+            1,
+        ),
+    ]:
+        assert _value(text, sample) - _value(before, sample) == delta, sample
+
+    inserts = 'db_query_duration_seconds_count{database="primary",operation="INSERT"}'
+    assert _value(text, inserts) > _value(before, inserts)
+    assert "db_pool_checked_out" in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_counts_user_cache_lookups(client):
+    before = (await client.get("/metrics")).text
+    body = {"email": "cached@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    for _ in range(3):
+        assert (await client.get("/users/me")).status_code == 200
+    text = (await client.get("/metrics")).text
+
+    for result, delta in [("miss", 1), ("local", 2)]:
+        sample = f'user_cache_lookups_total{{result="{result}"}}'
+        assert _value(text, sample) - _value(before, sample) == delta, sample
@@ -0,0 +1,53 @@
+import pytest
+from budgets import QUERY_BUDGETS, Budget
+from fastapi.routing import APIRoute
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import EmailToken
+
+
+def test_every_route_has_a_budget():
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    assert routes - QUERY_BUDGETS.keys() == set(), "declare a budget in budgets.py"
+    assert QUERY_BUDGETS.keys() - routes == set(), "stale budget entries"
+
+
+@pytest.mark.asyncio
+async def test_request_over_budget_fails(client, monkeypatch):
+    body = {"email": "budget@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    monkeypatch.setitem(QUERY_BUDGETS, "GET /users/me", Budget(0))
+    with pytest.raises(AssertionError, match="GET /users/me issued 1 statements"):
+        await client.get("/users/me")
+
+
+@pytest.mark.asyncio
+async def test_email_flows_within_budget(client):
+    # budgets are enforced by the client fixture on every request
+    body = {"email": "flows@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    assert (await client.post("/auth/resend-verification")).status_code == 200
+
+    resp = await client.post(
+        "/auth/request-password-reset", json={"email": body["email"]}
+    )
+    assert resp.status_code == 200
+    async with SessionLocal() as db:
+        token = await db.scalar(
+            select(EmailToken.token).where(EmailToken.purpose == "reset_password")
+        )
+    resp = await client.post(
+        "/auth/reset-password", json={"token": token, "new_password": "new-pw"}
+    )
+    assert resp.status_code == 200
+    body["password"] = "new-pw"
+    assert (await client.post("/auth/login", json=body)).status_code == 200
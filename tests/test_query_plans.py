@@ -0,0 +1,77 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select, text, tuple_
+
+from alembic import command
+from alembic.config import Config
+from app.models import EmailToken, SessionToken, User
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# the queries on the request path, as issued by app/services
+HOT_QUERIES = {
+    "user by email": (
+        select(User).where(User.email == "a@example.com"),
+        "ix_user_email",
+    ),
+    "email token": (
+        select(EmailToken).where(
+            EmailToken.token == "tok", EmailToken.purpose == "verify_email"
+        ),
+        "ix_emailtoken_token",
+    ),
+    "list sessions": (
+        select(SessionToken.id, SessionToken.created_at)
+        .where(
+            SessionToken.user_id == 1,
+            tuple_(SessionToken.created_at, SessionToken.id)
+            < tuple_(datetime(2026, 1, 1), 100),
+        )
+        .order_by(SessionToken.created_at.desc(), SessionToken.id.desc())
+        .limit(51),
+        "ix_sessiontoken_user_id_created_at",
+    ),
+    "active sessions": (
+        select(SessionToken.id).where(
+            SessionToken.user_id == 1, SessionToken.revoked_at.is_(None)
+        ),
+        "ix_sessiontoken_active_user_id",
+    ),
+    "recently revoked": (
+        select(SessionToken.id, SessionToken.revoked_at).where(
+            SessionToken.revoked_at >= datetime(2026, 1, 1)
+        ),
+        "ix_sessiontoken_revoked_at",
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def migrated(tmp_path_factory):
+    """Engine on a SQLite file built by the migrations, not by create_all."""
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'app.db'}"
+    config = Config()  # no ini file: keeps alembic from reconfiguring logging
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", url)  # alembic/env.py prefers it
+        command.upgrade(config, "head")
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_queries_use_indexes(migrated, name):
+    stmt, index = HOT_QUERIES[name]
+    compiled = stmt.compile(
+        dialect=migrated.dialect, compile_kwargs={"literal_binds": True}
+    )
+    with migrated.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        plan = " | ".join(row.detail for row in rows)
+
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan
+    assert "SCAN" not in plan.replace(f"INDEX {index}", "")
+    assert "TEMP B-TREE" not in plan  # no sort step
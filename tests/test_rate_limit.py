@@ -0,0 +1,141 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import RateLimitPolicy, is_allowed
+from app.core.redis_client import CircuitBreaker
+from app.utils.cache import TTLCache
+from app.utils.shm_table import BUCKET_SLOTS, SharedExpiryTable
+
+
+@pytest.fixture(autouse=True)
+def _clear_store():
+    rate_limit._memory_store.clear()
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_limit_then_blocks():
+    results = [await is_allowed("k", limit=5, window_seconds=60) for _ in range(6)]
+    assert [allowed for allowed, _ in results] == [True] * 5 + [False]
+    # one slot frees up every window / limit seconds
+    assert results[-1][1] == 12
+
+
+@pytest.mark.asyncio
+async def test_shared_table_enforces_one_limit_across_workers(tmp_path, monkeypatch):
+    path = str(tmp_path / "rl")
+    # each worker process maps the same file
+    workers = [SharedExpiryTable(path, capacity=64) for _ in range(2)]
+    results = []
+    for i in range(6):
+        monkeypatch.setattr(rate_limit, "_shared_store", workers[i % 2])
+        results.append(await is_allowed("k", limit=5, window_seconds=60))
+    assert [allowed for allowed, _ in results] == [True] * 5 + [False]
+    assert results[-1][1] == 12
+    workers[0].clear()
+    assert (await is_allowed("k", limit=5, window_seconds=60))[0]
+    for table in workers:
+        table.close()
+
+
+def test_shared_table_is_consistent_between_processes(tmp_path):
+    path = str(tmp_path / "rl")
+    script = (
+        "import time\n"
+        "from app.core.rate_limit import _shared_is_allowed\n"
+        "from app.utils.shm_table import SharedExpiryTable\n"
+        f"table = SharedExpiryTable({path!r}, capacity=64)\n"
+        "print(sum(_shared_is_allowed(table, 'k', 5, 60)[0] for _ in range(4)))\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+        for _ in range(3)
+    ]
+    allowed = [int(p.communicate(timeout=60)[0]) for p in procs]
+    assert sum(allowed) == 5
+
+
+def test_shared_table_reuses_expired_slots_and_evicts_soonest(tmp_path):
+    table = SharedExpiryTable(str(tmp_path / "rl"), capacity=BUCKET_SLOTS)
+    assert table.buckets == 1
+
+    def put(expiry):
+        return lambda current: (expiry, current)
+
+    for i in range(BUCKET_SLOTS):
+        table.update(f"k{i}", 0, put(100 + i))
+    assert table.update("k3", 0, put(200)) == 103
+    # full of live entries: the one expiring soonest (k0) makes room
+    table.update("new", 0, put(300))
+    assert table.update("k0", 0, lambda current: (None, current)) is None
+    assert table.update("new", 0, lambda current: (None, current)) == 300
+    # past their expiry entries read as absent
+    assert table.update("k5", 150, lambda current: (None, current)) is None
+    assert table.update("k3", 150, lambda current: (None, current)) == 200
+    table.close()
+
+
+def test_ttl_cache_is_bounded_and_expires():
+    now = [0.0]
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, timer=lambda: now[0])
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.set("c", 3, ttl=10)
+    assert len(cache) == 2 and cache.get("a") is None
+
+    now[0] = 11
+    assert cache.get("b") is None
+    cache.set("d", 4, ttl=10)
+    assert len(cache) == 1 and cache.get("d") == 4
+
+
+def test_policy_parse():
+    assert RateLimitPolicy.parse("login", "5/60") == RateLimitPolicy("login", 5, 60)
+
+
+@pytest.mark.asyncio
+async def test_login_route_returns_429_with_retry_after(client):
+    body = {"email": "eve@example.com", "password": "x"}
+    for _ in range(rate_limit.login_policy.limit):
+        assert (await client.post("/auth/login", json=body)).status_code == 400
+    resp = await client.post("/auth/login", json=body)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_breaker_skips_failing_redis_until_probe_succeeds(monkeypatch):
+    calls = 0
+    healthy = False
+
+    async def script(keys, args):
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("redis down")
+
+    async def probe():
+        if not healthy:
+            raise ConnectionError("still down")
+
+    breaker = CircuitBreaker("test", threshold=3, probe_interval=0.01, probe=probe)
+    monkeypatch.setattr(rate_limit.settings, "REDIS_URL", "redis://unused")
+    monkeypatch.setattr(rate_limit, "_get_script", lambda: script)
+    monkeypatch.setattr(rate_limit, "breaker", breaker)
+
+    for _ in range(5):
+        assert (await is_allowed("k", limit=100, window_seconds=60))[0]
+    # three failures trip it; later checks go straight to the local store
+    assert calls == 3
+    assert breaker.stats()["state"] == "open" and breaker.trips == 1
+
+    await asyncio.sleep(0.05)
+    assert breaker.is_open
+    healthy = True
+    await asyncio.sleep(0.05)
+    assert not breaker.is_open
+    await is_allowed("k", limit=100, window_seconds=60)
+    assert calls == 4
+    await breaker.stop()
@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core import redis_client
+from app.core.redis_client import request_breaker
+from app.services.refresh import RedisRefreshCoalescer, RefreshCoalescer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_rotation():
+    calls = 0
+
+    async def rotate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return f"access{calls}", f"refresh{calls}"
+
+    coalescer = RefreshCoalescer(grace_seconds=5)
+    pairs = await asyncio.gather(*(coalescer.run(1, "fp", rotate) for _ in range(5)))
+    assert calls == 1
+    assert set(pairs) == {("access1", "refresh1")}
+
+    # within the grace window a late duplicate gets the same pair
+    assert await coalescer.run(1, "fp", rotate) == ("access1", "refresh1")
+    # but never a different device
+    with pytest.raises(ValueError):
+        await coalescer.run(1, "other-fp", rotate)
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_rotation_is_not_cached():
+    async def rotate():
+        raise ValueError("Invalid session")
+
+    coalescer = RefreshCoalescer(grace_seconds=5)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await coalescer.run(2, "fp", rotate)
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_trips_breaker_and_rotates_locally(monkeypatch):
+    redis_calls = 0
+    rotations = 0
+
+    class Down:
+        async def get(self, key):
+            nonlocal redis_calls
+            redis_calls += 1
+            raise ConnectionError("redis down")
+
+        ping = get
+
+    async def rotate():
+        nonlocal rotations
+        rotations += 1
+        return f"access{rotations}", f"refresh{rotations}"
+
+    monkeypatch.setattr(redis_client, "get_request_redis", lambda: Down())
+    monkeypatch.setattr(request_breaker, "threshold", 2)
+    monkeypatch.setattr(request_breaker, "probe_interval", 60)
+    coalescer = RedisRefreshCoalescer(grace_seconds=5)
+    try:
+        for sid in range(4):
+            assert await coalescer.run(sid, "fp", rotate) == (
+                f"access{sid + 1}",
+                f"refresh{sid + 1}",
+            )
+        # two failures open the breaker; later refreshes skip Redis entirely
+        assert redis_calls == 2 and request_breaker.is_open
+    finally:
+        await request_breaker.stop()
+        request_breaker.close()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_waiters_stop_polling_when_the_rotation_fails(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_request_redis", lambda: fake)
+    rotations = 0
+
+    async def rotate():
+        nonlocal rotations
+        rotations += 1
+        await asyncio.sleep(0.05)
+        raise ValueError("Invalid session")
+
+    # two workers refreshing the same session
+    started = time.monotonic()
+    results = await asyncio.gather(
+        RedisRefreshCoalescer(grace_seconds=5).run(1, "fp", rotate),
+        RedisRefreshCoalescer(grace_seconds=5).run(1, "fp", rotate),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert rotations == 2  # the waiter retried instead of waiting out the lock
+    assert time.monotonic() - started < 1
+    assert fake.data == {}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_refresh_cookie_gets_same_tokens(client):
+    body = {"email": "tabs@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    old_refresh = client.cookies["refresh_token"]
+
+    first = await client.post("/auth/refresh")
+    client.cookies.set("refresh_token", old_refresh)
+    second = await client.post("/auth/refresh")
+    assert first.status_code == second.status_code == 200
+    assert first.cookies["refresh_token"] == second.cookies["refresh_token"]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.models import SessionToken, User
+from app.services import auth as auth_svc
+
+
+@pytest.mark.asyncio
+async def test_parallel_refreshes_have_exactly_one_winner(tmp_path):
+    # a file database gives each session its own connection and transaction
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rotate.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as db:
+        uid = await db.scalar(
+            insert(User)
+            .values(email="x@example.com", password_hash="h")
+            .returning(User.id)
+        )
+        await db.commit()
+        _, _, st = await auth_svc.create_session(db, uid, "1.1.1.1", "ua")
+        await db.commit()
+
+    async def attempt():
+        async with Session() as db:
+            return await auth_svc.rotate_refresh(db, uid, st.id, "1.1.1.1", "ua")
+
+    results = await asyncio.gather(
+        *(attempt() for _ in range(8)), return_exceptions=True
+    )
+    winners = [r for r in results if not isinstance(r, Exception)]
+    losers = [r for r in results if isinstance(r, Exception)]
+    assert len(winners) == 1
+    assert all(isinstance(e, ValueError) for e in losers)
+
+    async with Session() as db:
+        count = await db.scalar(select(func.count()).select_from(SessionToken))
+    assert count == 2
+    await engine.dispose()
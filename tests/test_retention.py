@@ -0,0 +1,102 @@
+import argparse
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.cli import purge as purge_cli
+from app.db.session import SessionLocal
+from app.models import AuditLog, EmailOutbox, EmailToken, SessionToken, User
+from app.services.retention import default_policies, purge_all
+
+
+async def _seed(now: datetime) -> None:
+    old = now - timedelta(days=365)
+    async with SessionLocal() as db:
+        user = User(email="old@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        for i in range(5):
+            db.add(
+                EmailToken(
+                    user_id=user.id,
+                    token=f"old{i}",
+                    purpose="verify_email",
+                    expires_at=old,
+                )
+            )
+        db.add(
+            EmailToken(
+                user_id=user.id,
+                token="fresh",
+                purpose="verify_email",
+                expires_at=now + timedelta(hours=1),
+            )
+        )
+        session = dict(
+            user_id=user.id,
+            refresh_token_hash="h",
+            ip="1.2.3.4",
+            user_agent="ua",
+            device_fingerprint="fp",
+        )
+        db.add(SessionToken(**session, created_at=old, revoked_at=old))
+        db.add(SessionToken(**session, created_at=old))  # refresh long expired
+        db.add(SessionToken(**session, created_at=now, revoked_at=now))
+        db.add(SessionToken(**session, created_at=now))
+        for i in range(3):
+            db.add(
+                AuditLog(
+                    user_id=user.id,
+                    action="login",
+                    ip="",
+                    user_agent="",
+                    created_at=old,
+                )
+            )
+        db.add(AuditLog(user_id=user.id, action="login", ip="", user_agent=""))
+        outbox = dict(recipient="a@example.com", subject="s", body="b", created_at=old)
+        db.add(EmailOutbox(**outbox, status="sent"))
+        db.add(EmailOutbox(**outbox))  # still pending: kept
+        await db.commit()
+
+
+async def _count(model) -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_only_expired_rows_in_chunks(db_engine):
+    await _seed(datetime.utcnow())
+
+    results = await purge_all(default_policies(), chunk_size=2)
+
+    assert {r.table: r.deleted for r in results} == {
+        "emailtoken": 5,
+        "sessiontoken": 2,
+        "auditlog": 3,
+        "emailoutbox": 1,
+    }
+    assert await _count(EmailToken) == 1
+    assert await _count(SessionToken) == 2
+    assert await _count(AuditLog) == 1
+    assert await _count(EmailOutbox) == 1
+
+    # nothing left to do on a second pass
+    assert all(r.deleted == 0 for r in await purge_all(chunk_size=2))
+
+
+@pytest.mark.asyncio
+async def test_empty_policy_list_purges_nothing(db_engine):
+    await _seed(datetime.utcnow())
+    assert await purge_all([], chunk_size=2) == []
+    assert await _count(EmailToken) == 6
+
+
+def test_purge_cli_rejects_unknown_table():
+    parser = argparse.ArgumentParser()
+    purge_cli.register(parser.add_subparsers())
+    with pytest.raises(SystemExit):
+        parser.parse_args(["purge", "--table", "emailtokens"])
+    assert parser.parse_args(["purge", "--table", "emailtoken"]).table == ["emailtoken"]
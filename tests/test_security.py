@@ -0,0 +1,115 @@
+import argparse
+import json
+from datetime import timedelta
+from unittest import mock
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+from app.cli import keys as keys_cli
+from app.core import security
+from app.core.keys import KeyRing
+from app.core.security import create_jwt_token, decode_jwt_cached
+
+
+def test_decode_jwt_cached_verifies_once():
+    token = create_jwt_token("1", timedelta(minutes=5), "access")
+    with mock.patch.object(security, "decode_jwt", wraps=security.decode_jwt) as dec:
+        assert decode_jwt_cached(token)["sub"] == "1"
+        assert decode_jwt_cached(token)["sub"] == "1"
+    assert dec.call_count == 1
+
+
+def test_decode_jwt_cached_rejects_expired_and_forged():
+    expired = create_jwt_token("1", timedelta(seconds=-1), "access")
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_jwt_cached(expired)
+    forged = jwt.encode({"sub": "1", "type": "access"}, "not-the-key", "HS256")
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_jwt_cached(forged)
+
+
+def _make_keys(path, *specs):
+    for kid, alg in specs:
+        keys_cli.run(argparse.Namespace(dir=str(path), kid=kid, alg=alg))
+
+
+def _retire(path, kid):
+    private = path / f"{kid}.pem"
+    key = serialization.load_pem_private_key(private.read_bytes(), password=None)
+    (path / f"{kid}.pub.pem").write_bytes(
+        key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    private.unlink()
+
+
+def test_keyring_signs_with_active_kid_and_verifies_across_rotation(tmp_path):
+    _make_keys(tmp_path, ("2026-09", "EdDSA"))
+    old = KeyRing.from_dir(str(tmp_path))
+    old_token = old.sign({"sub": "1"})
+    assert jwt.get_unverified_header(old_token) == {
+        "alg": "EdDSA",
+        "kid": "2026-09",
+        "typ": "JWT",
+    }
+
+    # publish the next key, switch to it, then retire the old one
+    _make_keys(tmp_path, ("2026-10", "ES256"))
+    _retire(tmp_path, "2026-09")
+    ring = KeyRing.from_dir(str(tmp_path))
+    assert ring.active.kid == "2026-10"
+    new_token = ring.sign({"sub": "2"})
+    # parsed once at load: no PEM parsing on the verification path
+    with mock.patch.object(serialization, "load_pem_public_key") as load:
+        assert ring.verify(old_token)["sub"] == "1"
+        assert ring.verify(new_token)["sub"] == "2"
+    load.assert_not_called()
+
+    jwks = json.loads(ring.jwks)["keys"]
+    assert {(k["kid"], k["alg"]) for k in jwks} == {
+        ("2026-09", "EdDSA"),
+        ("2026-10", "ES256"),
+    }
+    assert all("d" not in k for k in jwks)  # public halves only
+
+    with pytest.raises(ValueError):
+        KeyRing.from_dir(str(tmp_path), active_kid="2026-09")  # retired
+    _retire(tmp_path, "2026-10")
+    with pytest.raises(ValueError, match="No private key for active JWT kid"):
+        KeyRing.from_dir(str(tmp_path))  # public keys only
+
+
+def test_keyring_rejects_unknown_kid_hs256_and_alg_confusion(tmp_path):
+    _make_keys(tmp_path, ("k1", "EdDSA"))
+    ring = KeyRing.from_dir(str(tmp_path), secret="s")
+
+    stranger = KeyRing([], secret="s")
+    hs_token = stranger.sign({"sub": "1"})
+    with pytest.raises(jwt.InvalidTokenError):
+        ring.verify(hs_token)
+    legacy = KeyRing.from_dir(str(tmp_path), secret="s", legacy_hs256=True)
+    assert legacy.verify(hs_token)["sub"] == "1"
+
+    unknown = jwt.encode({"sub": "1"}, "s", algorithm="HS256", headers={"kid": "k9"})
+    with pytest.raises(jwt.InvalidTokenError):
+        ring.verify(unknown)
+    confused = jwt.encode(
+        {"sub": "1"}, "any-secret", algorithm="HS256", headers={"kid": "k1"}
+    )
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        ring.verify(confused)
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_is_cacheable(client):
+    resp = await client.get("/.well-known/jwks.json")
+    assert resp.status_code == 200
+    assert resp.json() == {"keys": []}  # HS256 mode in tests
+    assert resp.headers["cache-control"].startswith("public, max-age=")
+    etag = resp.headers["etag"]
+    resp = await client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
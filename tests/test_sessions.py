@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.db.session import SessionLocal
+from app.models import Role, SessionToken, User
+from app.services.revocation import RevocationCache, revocation_cache
+
+
+async def _login_with_history(client, n: int) -> int:
+    body = {"email": "pager@example.com", "password": "pw"}
+    await client.post("/auth/register", json=body)
+    await client.post("/auth/login", json=body)
+    base = datetime.utcnow() - timedelta(days=1)
+    async with SessionLocal() as db:
+        uid = await db.scalar(select(User.id).where(User.email == body["email"]))
+        for i in range(n):
+            db.add(
+                SessionToken(
+                    user_id=uid,
+                    refresh_token_hash="h",
+                    ip="1.2.3.4",
+                    user_agent="ua",
+                    device_fingerprint="fp",
+                    # pairs share a timestamp so the id tiebreak matters
+                    created_at=base + timedelta(minutes=i // 2),
+                    revoked_at=base if i % 3 else None,
+                )
+            )
+        await db.commit()
+    return uid
+
+
+@pytest.mark.asyncio
+async def test_sessions_keyset_pagination(client, query_counter):
+    await _login_with_history(client, 9)
+
+    seen, cursor = [], None
+    query_counter.reset()
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/sessions/", params=params)).json()
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 10  # 9 seeded + the live login
+    assert len({s["id"] for s in seen}) == 10
+    keys = [(s["created_at"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+    # only SessionOut's columns are read
+    selects = [s for s in query_counter.statements if "FROM sessiontoken" in s]
+    assert selects and all("refresh_token_hash" not in s for s in selects)
+
+
+@pytest.mark.asyncio
+async def test_sessions_active_only(client):
+    await _login_with_history(client, 9)
+    page = (await client.get("/sessions/", params={"active_only": "true"})).json()
+    assert len(page["items"]) == 4  # 3 seeded + the live login
+    assert all(s["revoked_at"] is None for s in page["items"])
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_sessions_rejects_bad_cursor(client):
+    await _login_with_history(client, 0)
+    resp = await client.get("/sessions/", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_revoke_all_keeps_current_session_on_request(client):
+    await _login_with_history(client, 9)
+
+    resp = await client.post("/sessions/revoke-all", params={"keep_current": "true"})
+    assert resp.json() == {"revoked": 3}
+    # the seeded sessions are older than any access token they could have issued
+    assert len(revocation_cache) == 0
+    assert (await client.get("/sessions/")).status_code == 200
+
+    assert (await client.post("/sessions/revoke-all")).json() == {"revoked": 1}
+    assert len(revocation_cache) == 1
+    assert (await client.get("/sessions/")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revoke_device_revokes_sessions_sharing_fingerprint(client):
+    await _login_with_history(client, 9)
+    async with SessionLocal() as db:
+        seeded = await db.scalar(
+            select(SessionToken.id).where(SessionToken.device_fingerprint == "fp")
+        )
+
+    resp = await client.post(f"/sessions/{seeded}/revoke-device")
+    assert resp.json() == {"revoked": 3}
+    # the live login has its own fingerprint and survives
+    page = (await client.get("/sessions/", params={"active_only": "true"})).json()
+    assert len(page["items"]) == 1
+    assert (await client.post("/sessions/999999/revoke-device")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_admin_revokes_sessions_created_in_range(client):
+    uid = await _login_with_history(client, 9)
+    async with SessionLocal() as db:
+        role = Role(name="admin")
+        db.add(role)
+        await db.flush()
+        await db.execute(update(User).where(User.id == uid).values(role_id=role.id))
+        await db.commit()
+    body = {"created_before": (datetime.utcnow() - timedelta(hours=1)).isoformat()}
+    resp = await client.post("/admin/sessions/revoke", json=body)
+    assert resp.json() == {"revoked": 3}
+    assert (await client.get("/sessions/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admin_session_revoke_requires_admin(client):
+    await _login_with_history(client, 0)
+    body = {"created_before": datetime.utcnow().isoformat()}
+    assert (await client.post("/admin/sessions/revoke", json=body)).status_code == 403
+
+
+def test_warns_without_redis_when_several_workers(monkeypatch, caplog):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    revocation_cache.start()
+    assert "other 3 workers" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_does_not_stop_startup(monkeypatch):
+    attempts = 0
+
+    async def load():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("no such table: sessiontoken")
+
+    monkeypatch.setattr(revocation_cache, "load", load)
+    await revocation_cache.warm_up(retry_interval=0.01)
+    await asyncio.sleep(0.1)
+    assert attempts == 2 and revocation_cache._loader is None
+    await revocation_cache.stop()
+
+
+def test_shared_memory_denylist_spans_workers(tmp_path):
+    path = str(tmp_path / "revoked")
+    worker_a = RevocationCache(ttl=60, maxsize=100, shm_path=path)
+    worker_b = RevocationCache(ttl=60, maxsize=100, shm_path=path)
+    worker_a.add([7])
+    assert worker_b.is_revoked(7) and not worker_b.is_revoked(8)
+    worker_a.add([8], ttl=-1)  # already past its access-token lifetime
+    assert not worker_b.is_revoked(8)
@@ -0,0 +1,35 @@
+import pytest
+
+from app.core import redis_client
+from app.core.redis_client import request_breaker
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import UserCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {"user:1": "{}", "user:2": "{}"}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_skipped_by_open_breaker_is_retried(monkeypatch, caplog):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_request_redis", lambda: fake)
+    monkeypatch.setattr(user_cache_module.settings, "REDIS_URL", "redis://unused")
+    cache = UserCache(local_ttl=30, maxsize=10, redis_ttl=60)
+
+    monkeypatch.setattr(request_breaker, "opened_at", 1.0)  # open
+    await cache.invalidate(1)
+    assert "invalidation of user 1 deferred" in caplog.text
+    assert "user:1" in fake.data
+
+    monkeypatch.setattr(request_breaker, "opened_at", None)  # closed again
+    await cache.get(None, 2)  # the next Redis call catches up first
+    assert "user:1" not in fake.data and "user:2" in fake.data
@@ -0,0 +1,80 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import pytest
+from sqlalchemy import select
+
+from app.core.security import password_needs_rehash
+from app.db.session import SessionLocal
+from app.models import User
+from app.services import auth as auth_svc
+from app.services.user_import import import_users, read_records
+
+LEGACY = bcrypt.hashpw(b"legacy-pw", bcrypt.gensalt(4)).decode()
+
+
+@pytest.mark.asyncio
+async def test_import_streams_batches_and_skips_duplicates(db_engine):
+    async with SessionLocal() as db:
+        db.add(User(email="taken@example.com", password_hash="x"))
+        await db.commit()
+
+    lines = [
+        {"email": "a@example.com", "password": "pw-a", "is_email_verified": True},
+        {"email": "b@example.com", "password_hash": LEGACY},
+        {"email": "taken@example.com", "password": "pw"},
+        {"email": "not-an-email", "password": "pw"},
+        {"email": "c@example.com", "password_hash": "plaintext?"},
+        {"email": "a@example.com", "password": "again"},  # later batch: conflict
+        {"email": "d@example.com", "password": "pw-d"},
+    ]
+    stream = io.StringIO("\n".join(json.dumps(line) for line in lines))
+    seen = []
+    with ThreadPoolExecutor(2) as executor:
+        stats = await import_users(
+            read_records(stream, "jsonl"),
+            executor,
+            batch_size=3,
+            progress=lambda s: seen.append(s.imported),
+        )
+
+    assert (stats.read, stats.imported, stats.existing, stats.invalid) == (7, 3, 2, 2)
+    assert seen == [2, 2, 3]  # one report per written batch
+    async with SessionLocal() as db:
+        users = {u.email: u for u in await db.scalars(select(User))}
+    assert users.keys() == {f"{c}@example.com" for c in ("taken", "a", "b", "d")}
+    assert users["taken@example.com"].password_hash == "x"  # not overwritten
+    assert users["a@example.com"].is_email_verified
+    assert users["b@example.com"].password_hash == LEGACY
+    assert users["d@example.com"].password_hash.startswith("$argon2")
+
+
+@pytest.mark.asyncio
+async def test_malformed_json_lines_are_skipped(db_engine):
+    stream = io.StringIO(
+        '{"email": "a@example.com", "pass\n'
+        '["e@example.com", "pw"]\n'
+        '{"email": "e@example.com", "password": "pw"}\n'
+    )
+    with ThreadPoolExecutor(1) as executor:
+        stats = await import_users(read_records(stream, "jsonl"), executor)
+    assert (stats.read, stats.imported, stats.invalid) == (3, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_imported_bcrypt_hash_logs_in_and_is_upgraded(db_engine):
+    csv_input = io.StringIO(f"email,password_hash\nlegacy@example.com,{LEGACY}\n")
+    with ThreadPoolExecutor(1) as executor:
+        await import_users(read_records(csv_input, "csv"), executor)
+
+    async with SessionLocal() as db:
+        await auth_svc.login(db, "legacy@example.com", "legacy-pw", "1.2.3.4", "ua")
+    await auth_svc.wait_for_rehashes()
+
+    async with SessionLocal() as db:
+        stored = await db.scalar(
+            select(User.password_hash).where(User.email == "legacy@example.com")
+        )
+    assert stored.startswith("$argon2") and not password_needs_rehash(stored)